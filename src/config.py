@@ -2,15 +2,42 @@ import json
 import os
 import re
 
+from filter_engine import FilterEngine
+from regex_guard import BUDGET_CHARS, DEFAULT_TIME_BUDGET, RegexGuard
+
 CONFIG_FILE = "config.json"
+CACHE_DIR = "cache"  # Carpeta junto a config.json para los índices de los logs
+DEFAULT_REFRESH_INTERVAL = 0.25  # Segundos mínimos entre dos lecturas del debug.log
+DEFAULT_RETENTION_MAX_ENTRIES = 0  # Entradas que conserva la vista (0 = sin límite)
+DEFAULT_RETENTION_MAX_MB = 50  # Megabytes que conserva la vista (0 = sin límite)
+DEFAULT_OPEN_TAIL_KB = 1024  # Al abrir, mostrar solo los últimos KB del debug.log (0 = todo)
+DEFAULT_OPEN_TAIL_ENTRIES = 0  # Al abrir, mostrar solo las últimas N entradas (0 = usar KB)
+DEFAULT_FOLD_DUPLICATES = True  # Agrupar en una sola entrada las repeticiones de un mismo mensaje
+DEFAULT_REGEX_TIME_BUDGET = DEFAULT_TIME_BUDGET  # Segundos que puede tardar una excepción en filtrar 256 KB
+
+# Línea que comienza con un timestamp de WordPress: [DD-MMM-YYYY HH:MM:SS UTC]
+TIMESTAMP_LINE_PATTERN = re.compile(r'^(\[\d{1,2}-\w{3}-\d{4}[^\S\n]\d{2}:\d{2}:\d{2}[^\S\n]\w+\])', re.MULTILINE)
 
 class Config:
     def __init__(self):
         self.config_path = os.path.join(os.path.dirname(__file__), '..', CONFIG_FILE)
+        self.cache_dir = os.path.join(os.path.dirname(self.config_path), CACHE_DIR)
         self.wp_content_path = None
         self.console_logs_path = None  # Ruta a la carpeta de logs de consola
         self.regex_exceptions = []  # Lista de expresiones regulares para filtrar
+        self.quarantined_exceptions = {}  # Expresión desactivada por lenta -> motivo
+        self.refresh_interval = DEFAULT_REFRESH_INTERVAL
+        self.retention_max_entries = DEFAULT_RETENTION_MAX_ENTRIES
+        self.retention_max_mb = DEFAULT_RETENTION_MAX_MB
+        self.open_tail_kb = DEFAULT_OPEN_TAIL_KB
+        self.open_tail_entries = DEFAULT_OPEN_TAIL_ENTRIES
+        self.regex_time_budget = DEFAULT_REGEX_TIME_BUDGET
+        self.hidden_levels = []  # Niveles de error ocultos en la vista (Fatal, Warning, ...)
+        self.fold_duplicates = DEFAULT_FOLD_DUPLICATES
+        self.filter_engines = {}  # (excepciones, indicadores) -> FilterEngine compilado
         self.load_config()
+        # Filtrado con límite de tiempo en un proceso aparte
+        self.regex_guard = RegexGuard(self.regex_time_budget)
 
     def load_config(self):
         if os.path.exists(self.config_path):
@@ -19,12 +46,30 @@ class Config:
                 self.wp_content_path = config.get('wp_content_path')
                 self.console_logs_path = config.get('console_logs_path')
                 self.regex_exceptions = config.get('regex_exceptions', [])
+                self.quarantined_exceptions = config.get('quarantined_exceptions', {})
+                self.refresh_interval = config.get('refresh_interval', DEFAULT_REFRESH_INTERVAL)
+                self.retention_max_entries = config.get('retention_max_entries', DEFAULT_RETENTION_MAX_ENTRIES)
+                self.retention_max_mb = config.get('retention_max_mb', DEFAULT_RETENTION_MAX_MB)
+                self.open_tail_kb = config.get('open_tail_kb', DEFAULT_OPEN_TAIL_KB)
+                self.open_tail_entries = config.get('open_tail_entries', DEFAULT_OPEN_TAIL_ENTRIES)
+                self.regex_time_budget = config.get('regex_time_budget', DEFAULT_REGEX_TIME_BUDGET)
+                self.hidden_levels = config.get('hidden_levels', [])
+                self.fold_duplicates = config.get('fold_duplicates', DEFAULT_FOLD_DUPLICATES)
 
     def save_config(self):
         config = {
             'wp_content_path': self.wp_content_path,
             'console_logs_path': self.console_logs_path,
-            'regex_exceptions': self.regex_exceptions
+            'regex_exceptions': self.regex_exceptions,
+            'quarantined_exceptions': self.quarantined_exceptions,
+            'refresh_interval': self.refresh_interval,
+            'retention_max_entries': self.retention_max_entries,
+            'retention_max_mb': self.retention_max_mb,
+            'open_tail_kb': self.open_tail_kb,
+            'open_tail_entries': self.open_tail_entries,
+            'regex_time_budget': self.regex_time_budget,
+            'hidden_levels': self.hidden_levels,
+            'fold_duplicates': self.fold_duplicates
         }
         with open(self.config_path, 'w') as f:
             json.dump(config, f)
@@ -41,6 +86,11 @@ class Config:
         self.save_config()
         return True
 
+    def set_hidden_levels(self, levels):
+        """Establecer los niveles de error ocultos en la vista y guardar la configuración"""
+        self.hidden_levels = list(levels)
+        self.save_config()
+
     def add_regex_exception(self, regex_pattern):
         """Añadir una nueva expresión regular a la lista de excepciones"""
         try:
@@ -61,6 +111,8 @@ class Config:
         """Eliminar una expresión regular de la lista de excepciones"""
         if regex_pattern in self.regex_exceptions:
             self.regex_exceptions.remove(regex_pattern)
+            self.quarantined_exceptions.pop(regex_pattern, None)
+            self.regex_guard.reset_stats(regex_pattern)
             self.save_config()
             return True
         return False
@@ -68,8 +120,62 @@ class Config:
     def clear_regex_exceptions(self):
         """Eliminar todas las expresiones regulares de la lista de excepciones"""
         self.regex_exceptions = []
+        self.quarantined_exceptions = {}
+        self.regex_guard.reset_stats()
         self.save_config()
 
+    def check_regex_exception(self, regex_pattern):
+        """Comprobar una expresión antes de añadirla; devolver el motivo del rechazo o None"""
+        try:
+            re.compile(regex_pattern)
+        except re.error as e:
+            return f"La expresión regular no es válida: {e}"
+        if not self.regex_guard.is_fast(regex_pattern, re.MULTILINE):
+            return (f"La expresión regular tarda más de {self.regex_time_budget} s con un texto de prueba "
+                    "(retroceso catastrófico); reescríbela sin repeticiones anidadas")
+        return None
+
+    def quarantine_regex_exception(self, regex_pattern, reason):
+        """Desactivar una expresión sin quitarla de la lista, guardando el motivo"""
+        if regex_pattern in self.regex_exceptions:
+            self.quarantined_exceptions[regex_pattern] = reason
+            self.save_config()
+
+    def release_regex_exception(self, regex_pattern):
+        """Volver a activar una expresión puesta en cuarentena"""
+        if self.quarantined_exceptions.pop(regex_pattern, None) is not None:
+            self.save_config()
+            return True
+        return False
+
+    def get_exception_stats(self, regex_pattern):
+        """Devolver (coincidencias, bytes suprimidos, segundos de evaluación) de una expresión en esta sesión"""
+        return self.regex_guard.get_stats(regex_pattern)
+
+    def get_active_regex_exceptions(self):
+        """Devolver las expresiones de excepción que no están en cuarentena"""
+        return [regex for regex in self.regex_exceptions if regex not in self.quarantined_exceptions]
+
+    def apply_regex_exceptions(self, content, replacement, flags=0):
+        """Filtrar con las excepciones activas y límite de tiempo; devolver (contenido, expresiones puestas en cuarentena)"""
+        filtered, slow = self.regex_guard.sub(self.get_active_regex_exceptions(), flags, content, replacement)
+        for regex in slow:
+            print(f"Excepción en cuarentena por superar el límite de tiempo al filtrar el log: {regex}")
+            self.quarantine_regex_exception(regex, f"superó el límite de {self.regex_time_budget} s "
+                                                   f"por cada {BUDGET_CHARS // 1024} KB al filtrar el log")
+        return filtered, slow
+
+    def get_filter_engine(self, flags=0):
+        """Devolver el motor de filtrado de las excepciones actuales, compilado una sola vez"""
+        key = (tuple(self.get_active_regex_exceptions()), flags)
+        engine = self.filter_engines.get(key)
+        if engine is None:
+            # Los motores de listas de excepciones anteriores ya no se usan
+            self.filter_engines = {k: v for k, v in self.filter_engines.items() if k[0] == key[0]}
+            engine = FilterEngine(key[0], flags)
+            self.filter_engines[key] = engine
+        return engine
+
     def get_latest_console_log(self):
         """Obtener el archivo de log de consola más reciente"""
         if not self.console_logs_path or not os.path.exists(self.console_logs_path):
@@ -93,67 +199,68 @@ class Config:
         if not self.regex_exceptions:
             return content
 
+        engine = self.get_filter_engine()
+
         # Dividir el contenido en líneas
         lines = content.split('\n')
+        line_count = len(lines)
+
+        # Segmentar una sola vez: líneas que comienzan con un timestamp [DD-MMM-YYYY HH:MM:SS UTC]
+        timestamp_lines = []
+        line_number = 0
+        position = 0
+        for match in TIMESTAMP_LINE_PATTERN.finditer(content):
+            line_number += content.count('\n', position, match.start())
+            position = match.start()
+            timestamp_lines.append(line_number)
+
         filtered_lines = []
+        next_timestamp = 0  # Posición en timestamp_lines del primer timestamp en la línea actual o después
 
         # Procesar cada línea
         i = 0
-        while i < len(lines):
-            line = lines[i]
-            should_exclude = False
-
-            # Verificar si la línea coincide con alguna expresión regular
-            for regex_pattern in self.regex_exceptions:
-                try:
-                    if re.search(regex_pattern, line):
-                        should_exclude = True
-                        # Encontramos un patrón a excluir, ahora debemos identificar el bloque completo
-
-                        # Buscar el inicio del bloque (línea con timestamp)
-                        start_index = i
-                        while start_index > 0:
-                            # Buscar una línea que comience con un timestamp [DD-MMM-YYYY HH:MM:SS UTC]
-                            if re.match(r'^\[\d{1,2}-\w{3}-\d{4}\s\d{2}:\d{2}:\d{2}\s\w+\]', lines[start_index-1]):
-                                if start_index > 1 and lines[start_index-2].strip() == '':
-                                    # Si hay una línea en blanco antes, considerarla como separador de bloques
-                                    start_index -= 1
-                                break
-                            start_index -= 1
-
-                        # Buscar el final del bloque (próxima línea con timestamp o fin del contenido)
-                        end_index = i
-                        while end_index < len(lines) - 1:
-                            end_index += 1
-                            # Si encontramos una línea que comienza con timestamp, es el inicio del siguiente bloque
-                            if re.match(r'^\[\d{1,2}-\w{3}-\d{4}\s\d{2}:\d{2}:\d{2}\s\w+\]', lines[end_index]):
-                                break
-
-                        # Si el final es el último índice, incluirlo
-                        if end_index == len(lines) - 1:
-                            end_index = len(lines)
-
-                        # Obtener el timestamp del bloque para el mensaje resumido
-                        timestamp_match = re.match(r'^(\[\d{1,2}-\w{3}-\d{4}\s\d{2}:\d{2}:\d{2}\s\w+\])', lines[start_index])
-                        timestamp = timestamp_match.group(1) if timestamp_match else "[Timestamp no encontrado]"
-
-                        # Añadir el mensaje resumido
-                        if start_index > 0 and filtered_lines and filtered_lines[-1].strip() != '':
-                            filtered_lines.append('')  # Línea en blanco para separar
-                        filtered_lines.append(f"{timestamp} Contenido omitido... (coincide con '{regex_pattern}')")
-
-                        # Saltar al final del bloque
-                        i = end_index - 1
-                        break
-                except re.error:
-                    # Ignorar expresiones regulares inválidas
-                    pass
-
-            # Si no debe excluirse, añadir la línea al resultado
-            if not should_exclude:
-                filtered_lines.append(line)
-
-            i += 1
+        while i < line_count:
+            while next_timestamp < len(timestamp_lines) and timestamp_lines[next_timestamp] < i:
+                next_timestamp += 1
+
+            # Primera expresión regular (en el orden configurado) que coincide con la línea
+            regex_pattern = engine.search(lines[i])
+            if regex_pattern is None:
+                filtered_lines.append(lines[i])
+                i += 1
+                continue
+
+            # Inicio del bloque: la línea siguiente al timestamp anterior (o el propio timestamp
+            # si le precede una línea en blanco que separa bloques)
+            if next_timestamp > 0:
+                previous = timestamp_lines[next_timestamp - 1]
+                start_index = previous + 1
+                if previous > 0 and lines[previous - 1].strip() == '':
+                    start_index = previous
+            else:
+                start_index = 0
+
+            # Final del bloque: el próximo timestamp posterior a la línea (si es la última
+            # línea, o no hay ninguno, el bloque llega hasta el final del contenido)
+            following = next_timestamp
+            if following < len(timestamp_lines) and timestamp_lines[following] == i:
+                following += 1
+            if following < len(timestamp_lines) and timestamp_lines[following] < line_count - 1:
+                end_index = timestamp_lines[following]
+            else:
+                end_index = line_count
+
+            # Obtener el timestamp del bloque para el mensaje resumido
+            timestamp_match = TIMESTAMP_LINE_PATTERN.match(lines[start_index])
+            timestamp = timestamp_match.group(1) if timestamp_match else "[Timestamp no encontrado]"
+
+            # Añadir el mensaje resumido
+            if start_index > 0 and filtered_lines and filtered_lines[-1].strip() != '':
+                filtered_lines.append('')  # Línea en blanco para separar
+            filtered_lines.append(f"{timestamp} Contenido omitido... (coincide con '{regex_pattern}')")
+
+            # Saltar al final del bloque
+            i = end_index
 
         # Unir las líneas filtradas
         return '\n'.join(filtered_lines)
@@ -0,0 +1,109 @@
+"""
+WordPress Debug Viewer - Agrupación de entradas repetidas por la huella de su mensaje
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import re
+import time
+
+# Cabecera de la entrada ("[17-Oct-2026 10:11:12 UTC] "), que no forma parte del mensaje
+HEADER_PATTERN = re.compile(r'\[[^\]\n]*\][^\S\n]*')
+# Partes del mensaje que cambian entre repeticiones: direcciones de memoria, identificadores
+# hexadecimales (por ejemplo, spl_object_hash) y números
+VARIABLE_PATTERN = re.compile(r'0x[0-9a-fA-F]+|\b[0-9a-fA-F]{8,}\b|\d+')
+
+
+def fingerprint(entry):
+    """Huella del mensaje de una entrada, o None si no se puede agrupar"""
+    # Solo se agrupan entradas con cabecera y con la primera línea completa: las que
+    # continúan a otra, los avisos de la interfaz y las líneas a medio escribir se muestran tal cual
+    if entry.continued:
+        return None
+    text = entry.text
+    end = text.find('\n')
+    header = HEADER_PATTERN.match(text)
+    if end < 0 or not header:
+        return None
+    return entry.level, VARIABLE_PATTERN.sub('#', text[header.end():end])
+
+
+def add_repeat(representative, entry):
+    """Contar entry como una repetición más de representative"""
+    if representative.repeats == 1:
+        representative.first_seen = representative.last_seen = representative.timestamp
+    representative.repeats += 1
+    timestamp = entry.timestamp
+    if timestamp is None:
+        return
+    if representative.first_seen is None or timestamp < representative.first_seen:
+        representative.first_seen = timestamp
+    if representative.last_seen is None or timestamp > representative.last_seen:
+        representative.last_seen = timestamp
+
+
+def format_seen(timestamp, with_date):
+    """Hora (y fecha, si se pide) de una marca de tiempo en UTC"""
+    return time.strftime('%d-%b-%Y %H:%M:%S' if with_date else '%H:%M:%S', time.gmtime(timestamp))
+
+
+def fold_note(entry):
+    """Texto que acompaña a una entrada agrupada: repeticiones y primera/última vez vista"""
+    note = f"  (repetido {entry.repeats} veces"
+    if entry.first_seen is not None and entry.last_seen is not None:
+        with_date = time.gmtime(entry.first_seen)[:3] != time.gmtime(entry.last_seen)[:3]
+        note += (f"; primera {format_seen(entry.first_seen, with_date)}, "
+                 f"última {format_seen(entry.last_seen, with_date)}")
+    return note + ")"
+
+
+class DuplicateFolder:
+    """Juntar las repeticiones de un mismo mensaje en la entrada que lo mostró primero"""
+
+    def __init__(self):
+        self.folds = {}  # Huella -> entrada que representa todas sus repeticiones
+        self.absorbing = False  # La última entrada añadida era una repetición
+
+    def clear(self):
+        """Olvidar todas las huellas"""
+        self.folds = {}
+        self.absorbing = False
+
+    def fold(self, entries, prepend=False):
+        """Devolver (entradas nuevas, representante de cada repetición absorbida)"""
+        # Las entradas anteriores que se añaden al principio no siguen a la última añadida
+        absorbing = False if prepend else self.absorbing
+        kept = []
+        absorbed = []
+        for entry in entries:
+            if entry.continued:
+                # El resto de una repetición (por ejemplo, su traza) se descarta con ella
+                if not absorbing:
+                    kept.append(entry)
+                continue
+
+            absorbing = False
+            key = fingerprint(entry)
+            representative = self.folds.get(key) if key is not None else None
+            if representative is None:
+                if key is not None:
+                    self.folds[key] = entry
+                kept.append(entry)
+                continue
+
+            add_repeat(representative, entry)
+            absorbed.append(representative)
+            absorbing = True
+
+        if not prepend:
+            self.absorbing = absorbing
+        return kept, absorbed
+
+    def is_representative(self, entry):
+        """Comprobar si una entrada sigue representando a sus repeticiones"""
+        key = fingerprint(entry)
+        return key is not None and self.folds.get(key) is entry
+
+    def forget(self, entry):
+        """Dejar de agrupar en una entrada que ya no se retiene"""
+        if self.is_representative(entry):
+            del self.folds[fingerprint(entry)]
@@ -0,0 +1,478 @@
+"""
+WordPress Debug Viewer - Motor de filtrado con todas las excepciones compiladas a la vez
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import re
+import time
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+# Códigos del analizador de expresiones regulares que impiden combinar un patrón con otros
+# (las referencias numéricas cambian de número dentro de la expresión combinada)
+GROUP_REFERENCES = {sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS}
+# Indicador que se añade por defecto a los patrones de texto y que no afecta a la combinación
+DEFAULT_PARSE_FLAGS = re.UNICODE
+
+# Cada cuántas sustituciones se mide por separado el coste de los patrones combinados,
+# y sobre cuántos caracteres del fragmento
+PROFILE_INTERVAL = 16
+PROFILE_SAMPLE_CHARS = 64 * 1024
+
+NEWLINE = ord('\n')
+# Cualquier carácter fuera de ASCII (str.isascii solo existe desde Python 3.7)
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+# Repeticiones y grupos atómicos (los dos últimos solo existen desde Python 3.11)
+REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, getattr(sre_parse, 'POSSESSIVE_REPEAT', None)}
+ATOMIC_GROUP = getattr(sre_parse, 'ATOMIC_GROUP', None)
+# Clases de caracteres que incluyen o excluyen con seguridad el salto de línea
+NEWLINE_CATEGORIES = {sre_parse.CATEGORY_SPACE, sre_parse.CATEGORY_NOT_DIGIT,
+                      sre_parse.CATEGORY_NOT_WORD, sre_parse.CATEGORY_LINEBREAK}
+NO_NEWLINE_CATEGORIES = {sre_parse.CATEGORY_DIGIT, sre_parse.CATEGORY_WORD,
+                         sre_parse.CATEGORY_NOT_SPACE, sre_parse.CATEGORY_NOT_LINEBREAK}
+
+
+def is_ascii(text):
+    """Comprobar si un texto solo contiene caracteres ASCII"""
+    return NON_ASCII_PATTERN.search(text) is None
+
+
+def uses_group_references(parsed):
+    """Comprobar si un patrón analizado contiene referencias a grupos (\\1, (?(1)...))"""
+    for op, av in parsed:
+        if op in GROUP_REFERENCES:
+            return True
+        # Recorrer los subpatrones (grupos, repeticiones, alternativas, aserciones...)
+        if isinstance(av, (list, tuple)):
+            for item in av:
+                if isinstance(item, sre_parse.SubPattern) and uses_group_references(item):
+                    return True
+                if isinstance(item, (list, tuple)):
+                    for sub in item:
+                        if isinstance(sub, sre_parse.SubPattern) and uses_group_references(sub):
+                            return True
+    return False
+
+
+def can_combine(pattern, compiled, flags=0):
+    """Comprobar si un patrón puede ir como alternativa dentro de la expresión combinada"""
+    if compiled.groupindex:
+        # Los nombres de grupo podrían repetirse entre patrones
+        return False
+    if compiled.flags & ~(DEFAULT_PARSE_FLAGS | flags):
+        # Indicadores globales en línea ((?i), (?s)...) afectarían a todos los patrones
+        return False
+    try:
+        # Los indicadores globales que repiten los del motor tampoco pueden ir en medio
+        re.compile(f"(?:{pattern})", flags)
+    except re.error:
+        return False
+    return not uses_group_references(sre_parse.parse(pattern, flags))
+
+
+def required_literals(parsed, flags):
+    """Literales de los que toda coincidencia contiene al menos uno, como {(literal, ignorecase)}, o None"""
+    best = None
+    run = []
+
+    def consider(candidate):
+        nonlocal best
+        # Se prefiere el conjunto cuyo literal más corto sea más largo (descarta más líneas)
+        if candidate and (best is None or
+                          min(len(lit) for lit, _ in candidate) > min(len(lit) for lit, _ in best)):
+            best = candidate
+
+    def close_run():
+        if run:
+            consider({("".join(run), bool(flags & re.IGNORECASE))})
+            run.clear()
+
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        close_run()
+        if op is sre_parse.SUBPATTERN:
+            group, add_flags, del_flags, subpattern = av
+            consider(required_literals(subpattern, (flags | add_flags) & ~del_flags))
+        elif op is ATOMIC_GROUP:
+            consider(required_literals(av, flags))
+        elif op in REPEATS:
+            min_count, max_count, item = av
+            if min_count >= 1:
+                consider(required_literals(item, flags))
+        elif op is sre_parse.BRANCH:
+            # Toda alternativa debe aportar algún literal
+            branches = [required_literals(branch, flags) for branch in av[1]]
+            if all(branches):
+                consider(set().union(*branches))
+    close_run()
+    return best
+
+
+def set_matches_newline(items):
+    """Para un conjunto [...] analizado: True si incluye el salto de línea, False si no, None si no se sabe"""
+    for op, av in items:
+        if op is sre_parse.NEGATE:
+            continue
+        if op is sre_parse.LITERAL:
+            if av == NEWLINE:
+                return True
+        elif op is sre_parse.RANGE:
+            if av[0] <= NEWLINE <= av[1]:
+                return True
+        elif op is sre_parse.CATEGORY:
+            if av in NEWLINE_CATEGORIES:
+                return True
+            if av not in NO_NEWLINE_CATEGORIES:
+                return None
+        else:
+            return None
+    return False
+
+
+def is_line_local(parsed, flags):
+    """Comprobar que ninguna coincidencia puede abarcar ni depender de un salto de línea"""
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            if av == NEWLINE:
+                return False
+        elif op is sre_parse.NOT_LITERAL:
+            if av != NEWLINE:
+                return False
+        elif op is sre_parse.ANY:
+            if flags & re.DOTALL:
+                return False
+        elif op is sre_parse.IN:
+            negated = bool(av) and av[0][0] is sre_parse.NEGATE
+            matches_newline = set_matches_newline(av)
+            if matches_newline is None or matches_newline != negated:
+                return False
+        elif op is sre_parse.AT:
+            # \Z y el $ sin MULTILINE dependen de dónde termina el texto completo
+            if av is sre_parse.AT_END_STRING:
+                return False
+            if av is sre_parse.AT_END and not flags & re.MULTILINE:
+                return False
+        elif op is sre_parse.SUBPATTERN:
+            group, add_flags, del_flags, subpattern = av
+            if not is_line_local(subpattern, (flags | add_flags) & ~del_flags):
+                return False
+        elif op is ATOMIC_GROUP:
+            if not is_line_local(av, flags):
+                return False
+        elif op in REPEATS:
+            if not is_line_local(av[2], flags):
+                return False
+        elif op is sre_parse.BRANCH:
+            if not all(is_line_local(branch, flags) for branch in av[1]):
+                return False
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            if not is_line_local(av[1], flags):
+                return False
+        elif op is sre_parse.GROUPREF_EXISTS:
+            group, yes, no = av
+            if not is_line_local(yes, flags) or (no is not None and not is_line_local(no, flags)):
+                return False
+        elif op is not sre_parse.GROUPREF:
+            return False
+    return True
+
+
+def analyze_pattern(pattern, compiled):
+    """Devolver (literales requeridos o None, si sus coincidencias quedan dentro de una línea)"""
+    try:
+        parsed = sre_parse.parse(pattern, compiled.flags)
+    except Exception:
+        return None, False
+    return required_literals(parsed, compiled.flags), is_line_local(parsed, compiled.flags)
+
+
+class LiteralPrefilter:
+    """Localizar las líneas que contienen alguno de los literales requeridos por los patrones"""
+
+    def __init__(self, literals):
+        # La búsqueda de varios literales a la vez la hace re en C con una alternativa de literales
+        # escapados; los literales sin distinguir mayúsculas se buscan en minúsculas sobre el
+        # texto en minúsculas, porque (?i) desactiva la búsqueda rápida por prefijo
+        exact = sorted({lit for lit, ignorecase in literals if not ignorecase}, key=len, reverse=True)
+        folded = sorted({lit for lit, ignorecase in literals if ignorecase}, key=len, reverse=True)
+        self.exact = re.compile("|".join(map(re.escape, exact))) if exact else None
+        self.folded = None
+        self.folded_fallback = None
+        if folded:
+            self.folded_fallback = re.compile("|".join(map(re.escape, folded)), re.IGNORECASE)
+            if all(is_ascii(lit) for lit in folded):
+                self.folded = re.compile("|".join(re.escape(lit.lower()) for lit in folded))
+
+    def contains_any(self, text):
+        """Comprobar si text contiene alguno de los literales"""
+        if self.exact is not None and self.exact.search(text):
+            return True
+        if self.folded_fallback is not None:
+            if self.folded is not None and is_ascii(text):
+                return self.folded.search(text.lower()) is not None
+            return self.folded_fallback.search(text) is not None
+        return False
+
+    def candidate_lines(self, content):
+        """Devolver, en orden, los tramos (inicio, fin) de las líneas con algún literal"""
+        lines = {}
+        if self.exact is not None:
+            self._collect(self.exact, content, content, lines)
+        if self.folded_fallback is not None:
+            if self.folded is not None and is_ascii(content):
+                # En ASCII, pasar a minúsculas conserva las posiciones y equivale a (?i)
+                self._collect(self.folded, content.lower(), content, lines)
+            else:
+                self._collect(self.folded_fallback, content, content, lines)
+        return sorted(lines.items())
+
+    def _collect(self, scanner, text, content, lines):
+        """Añadir a lines las líneas de content en las que scanner encuentra un literal"""
+        position = 0
+        while True:
+            match = scanner.search(text, position)
+            if not match:
+                return
+            line_start = content.rfind('\n', 0, match.start()) + 1
+            line_end = content.find('\n', match.end())
+            if line_end == -1:
+                line_end = len(content)
+            lines[line_start] = line_end
+            position = line_end + 1
+
+
+def sub_candidate_lines(compiled, prefilter, content, replacement, on_match=None):
+    """Sustituir las coincidencias ejecutando el patrón solo en las líneas candidatas"""
+    parts = []
+    last = 0
+    for line_start, line_end in prefilter.candidate_lines(content):
+        # Con pos y endpos el patrón ve el texto completo ((?<=...), ^), igual que en sub()
+        for match in compiled.finditer(content, line_start, line_end):
+            if on_match is not None:
+                on_match(match)
+            parts.append(content[last:match.start()])
+            parts.append(replacement)
+            last = match.end()
+    if not parts:
+        return content
+    parts.append(content[last:])
+    return "".join(parts)
+
+
+def shift_positions(positions, spans, replacement_length):
+    """Trasladar posiciones ordenadas del texto original al texto con los tramos spans sustituidos"""
+    shifted = []
+    delta = 0
+    index = 0
+    for position in positions:
+        # Tramos que terminan antes de la posición: la desplazan según lo que cambió su longitud
+        while index < len(spans) and spans[index][0] < position and spans[index][1] <= position:
+            start, end = spans[index]
+            delta += replacement_length - (end - start)
+            index += 1
+        if index < len(spans) and spans[index][0] < position < spans[index][1]:
+            # La posición cae dentro de una coincidencia: pasa a justo después de su sustitución
+            shifted.append(spans[index][0] + delta + replacement_length)
+        else:
+            shifted.append(position + delta)
+    return shifted
+
+
+def merge_stats(total, stats):
+    """Sumar a total las cifras (coincidencias, bytes, segundos) de cada patrón en stats"""
+    for pattern, (hits, size, seconds) in stats.items():
+        current = total.get(pattern, (0, 0, 0.0))
+        total[pattern] = (current[0] + hits, current[1] + size, current[2] + seconds)
+
+
+class FilterEngine:
+    """Aplicar todas las expresiones regulares de excepción en una sola pasada"""
+
+    def __init__(self, patterns, flags=0):
+        self.patterns = list(patterns)
+        self.flags = flags
+        # Alternativa sin grupos de captura: así re conserva la optimización por primer carácter
+        # y el coste apenas depende del número de patrones
+        self.combined = None
+        self.combined_patterns = []  # (patrón, compilado) incluidos en la expresión combinada
+        self.compiled = []  # (patrón, compilado) válidos, en el orden configurado
+        self.separate = []  # (patrón, compilado) que no se pueden combinar
+        self.invalid = []  # Patrones que no compilan
+        # Prefiltros de literales: solo se ejecutan los patrones en las líneas que los contienen
+        self.literals = {}  # Patrón -> literales requeridos (o None)
+        self.line_local = {}  # Patrón -> sus coincidencias no abarcan saltos de línea
+        self.combined_prefilter = None
+        self.separate_prefilters = {}  # Patrón separado -> LiteralPrefilter
+        self.search_prefilter = None  # Prefiltro de todos los patrones, si todos lo admiten
+        # Cifras por patrón desde la última llamada a take_stats: [coincidencias, bytes, segundos]
+        self.stats = {}
+        # Coste medido por separado de cada patrón combinado, para repartir el tiempo de la pasada
+        self.profile_costs = {}
+        self.sub_calls = 0
+
+        alternatives = []
+        for pattern in self.patterns:
+            try:
+                compiled = re.compile(pattern, flags)
+            except re.error as e:
+                print(f"Error al compilar el filtro regex '{pattern}': {e}")
+                self.invalid.append(pattern)
+                continue
+
+            self.compiled.append((pattern, compiled))
+            self.stats[pattern] = [0, 0, 0.0]
+            self.literals[pattern], self.line_local[pattern] = analyze_pattern(pattern, compiled)
+            if can_combine(pattern, compiled, flags):
+                alternatives.append(f"(?:{pattern})")
+                self.combined_patterns.append((pattern, compiled))
+            else:
+                self.separate.append((pattern, compiled))
+
+        if alternatives:
+            try:
+                self.combined = re.compile("|".join(alternatives), flags)
+            except re.error as e:
+                # No debería ocurrir; en ese caso se aplica cada patrón por separado
+                print(f"No se pudieron combinar los filtros regex: {e}")
+                self.separate = list(self.compiled)
+                self.combined_patterns = []
+
+        # Para sustituir línea a línea, las coincidencias además deben quedar dentro de una línea
+        if self.combined is not None and all(self.literals[p] and self.line_local[p]
+                                             for p, _ in self.combined_patterns):
+            self.combined_prefilter = LiteralPrefilter(
+                set().union(*(self.literals[p] for p, _ in self.combined_patterns)))
+        for pattern, compiled in self.separate:
+            if self.literals[pattern] and self.line_local[pattern]:
+                self.separate_prefilters[pattern] = LiteralPrefilter(self.literals[pattern])
+        if self.compiled and all(self.literals[p] for p, _ in self.compiled):
+            self.search_prefilter = LiteralPrefilter(
+                set().union(*(self.literals[p] for p, _ in self.compiled)))
+
+    def is_empty(self):
+        """Comprobar si no hay ningún patrón válido que aplicar"""
+        return self.combined is None and not self.separate
+
+    def sub(self, content, replacement):
+        """Sustituir por replacement todo lo que coincida con alguno de los patrones"""
+        return self._sub_all(content, replacement)[0]
+
+    def sub_entries(self, texts, replacement):
+        """Sustituir como sub() sobre el texto seguido de varias entradas y devolver el de cada una"""
+        positions = []
+        total = 0
+        for text in texts:
+            positions.append(total)
+            total += len(text)
+        content, new_positions = self._sub_all("".join(texts), replacement, positions)
+        if new_positions is positions:
+            # Sin coincidencias: las entradas no cambian
+            return list(texts)
+        # Una coincidencia que abarca varias entradas queda en la primera; las demás se recortan
+        new_positions.append(len(content))
+        return [content[new_positions[i]:new_positions[i + 1]] for i in range(len(texts))]
+
+    def _sub_all(self, content, replacement, positions=None):
+        """Aplicar todas las pasadas; devolver el contenido y positions trasladadas al resultado"""
+        if not content or self.is_empty():
+            return content, positions
+
+        if self.combined is not None:
+            if self.sub_calls % PROFILE_INTERVAL == 0:
+                self._profile_combined(content)
+            spans = [] if positions is not None else None
+            started = time.perf_counter()
+            content = self._sub(self.combined, self.combined_prefilter, content, replacement, spans=spans)
+            self._share_time(time.perf_counter() - started)
+            if spans:
+                positions = shift_positions(positions, spans, len(replacement))
+        for pattern, compiled in self.separate:
+            spans = [] if positions is not None else None
+            started = time.perf_counter()
+            content = self._sub(compiled, self.separate_prefilters.get(pattern), content, replacement,
+                                pattern, spans)
+            self.stats[pattern][2] += time.perf_counter() - started
+            if spans:
+                positions = shift_positions(positions, spans, len(replacement))
+        self.sub_calls += 1
+        return content, positions
+
+    def _sub(self, compiled, prefilter, content, replacement, pattern=None, spans=None):
+        """Sustituir con un patrón, usando su prefiltro de literales si lo tiene"""
+        def record(match):
+            if spans is not None:
+                spans.append(match.span())
+            # Coincidencias y bytes suprimidos del patrón (el de la alternativa si es la combinada)
+            stats = self.stats.get(pattern or self.identify(match))
+            if stats is None:
+                return
+            stats[0] += 1
+            text = match.group()
+            stats[1] += len(text) if is_ascii(text) else len(text.encode('utf-8', errors='ignore'))
+
+        if prefilter is not None:
+            return sub_candidate_lines(compiled, prefilter, content, replacement, record)
+
+        def replace(match):
+            # La sustitución es literal: las barras invertidas no se interpretan
+            record(match)
+            return replacement
+        return compiled.sub(replace, content)
+
+    def _profile_combined(self, content):
+        """Medir por separado, sobre una muestra del fragmento, el coste de cada patrón combinado"""
+        if len(self.combined_patterns) < 2:
+            return
+        sample = content[:PROFILE_SAMPLE_CHARS]
+        for pattern, compiled in self.combined_patterns:
+            started = time.perf_counter()
+            for _ in compiled.finditer(sample):
+                pass
+            self.profile_costs[pattern] = self.profile_costs.get(pattern, 0.0) + time.perf_counter() - started
+
+    def _share_time(self, elapsed):
+        """Repartir el tiempo de la pasada combinada según el coste medido de cada patrón"""
+        total = sum(self.profile_costs.values())
+        for pattern, _ in self.combined_patterns:
+            share = self.profile_costs.get(pattern, 0.0) / total if total else 1 / len(self.combined_patterns)
+            self.stats[pattern][2] += elapsed * share
+
+    def take_stats(self):
+        """Devolver las cifras por patrón acumuladas desde la llamada anterior y ponerlas a cero"""
+        stats = {pattern: tuple(values) for pattern, values in self.stats.items() if any(values)}
+        for values in self.stats.values():
+            values[:] = [0, 0, 0.0]
+        return stats
+
+    def identify(self, match):
+        """Devolver el patrón original que produjo una coincidencia de la expresión combinada"""
+        # La alternativa elegida es la primera que coincide en esa misma posición
+        for pattern, compiled in self.combined_patterns:
+            if compiled.match(match.string, match.start()):
+                return pattern
+        return None
+
+    def search(self, content):
+        """Devolver el primer patrón (en el orden configurado) que coincide con content, o None"""
+        if self.search_prefilter is not None and not self.search_prefilter.contains_any(content):
+            return None
+
+        match = self.combined.search(content) if self.combined is not None else None
+        if match is None:
+            # Ninguno de los patrones combinados coincide: solo quedan los separados
+            candidates = self.separate
+            matched = None
+        else:
+            # Un patrón anterior en la lista puede coincidir más adelante en el texto
+            candidates = self.compiled
+            matched = self.identify(match)
+
+        for pattern, compiled in candidates:
+            if pattern == matched or compiled.search(content):
+                return pattern
+        return None
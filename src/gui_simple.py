@@ -1,12 +1,38 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import pyperclip
-import threading
 import time
-import re
 import os
 import subprocess
 import sys
+import threading
+from itertools import islice
+
+from duplicates import fold_note
+from log_entry import LEVEL_CUSTOM, LEVEL_ORDER, LogEntry, entries_from_text, level_runs
+from retention import RetentionBuffer
+from search_query import SearchQuery
+from text_search import SearchJob, find_in_runs, shift_matches, snapshot_entries
+from update_queue import UpdateQueue
+
+# Frecuencia máxima (actualizaciones por segundo) con la que se vuelca la cola en la interfaz
+MAX_UPDATES_PER_SECOND = 30
+# Cambios del área de texto oculta que se guardan antes de optar por repintarla entera
+MAX_PENDING_TEXT_UPDATES = 200
+# Cada cuántos milisegundos se actualizan las cifras de la ventana de excepciones
+EXCEPTIONS_STATS_INTERVAL_MS = 2000
+# Cada cuántos milisegundos se recogen los resultados parciales de la búsqueda en curso
+SEARCH_POLL_INTERVAL_MS = 100
+# Cada cuántos milisegundos se mira si terminó la comprobación de una excepción nueva
+EXCEPTION_CHECK_POLL_MS = 100
+# Altura en píxeles de cada fila de la vista de selección
+BLOCK_ROW_HEIGHT = 100
+# Nombre de cada nivel en el filtro de niveles y color de sus entradas en la vista normal
+LEVEL_LABELS = {"Fatal": "Fatal", "Warning": "Warning", "Notice": "Notice",
+                "Deprecated": "Deprecated", LEVEL_CUSTOM: "Otros"}
+# Color de la nota de repeticiones de las entradas agrupadas
+FOLD_NOTE_COLOR = "#6c757d"
+LEVEL_COLORS = {"Fatal": "#c0392b", "Warning": "#b7791f"}
 
 class DebuggerGUI:
     def resource_path(self, relative_path):
@@ -23,32 +49,87 @@ class DebuggerGUI:
         self.on_path_selected = on_path_selected
         self.on_clear_content = on_clear_content
         self.on_reload_content = None  # Se asignará más tarde
+        self.on_load_history = None  # Se asignará más tarde
+        self.on_jump_to_time = None  # Se asignará más tarde
+        self.on_refilter_content = None  # Se asignará más tarde
+        self.status_label = None  # Progreso de las tareas en segundo plano
+        self.scroll_to_top_pending = False  # Mostrar el principio tras el próximo repintado completo
         self.is_window_open = False
         self.config = config
         self.exceptions_window = None
+        self.exceptions_listbox = None  # Lista de la ventana de excepciones, si está abierta
+        self.exceptions_stats_job = None
+        self.exception_check = None  # (hilo, expresión, resultado) de la excepción que se está comprobando
+        self.exception_check_job = None
         self.console_logs_window = None
         self.text_widget = None
         self.blocks_frame = None
-        self.canvas = None
+        self.blocks_scrollbar = None
         self.blocks = []
-        self.block_widgets = []
+        # Vista de selección virtual: solo existen las filas que caben en pantalla y se
+        # reutilizan al desplazarse. Cada bloque es una entrada retenida y la selección se
+        # guarda por entrada, así que sobrevive a las entradas que llegan o se descartan
+        self.block_rows = []  # (frame, variable del checkbox, texto) de cada fila
+        self.block_row_blocks = []  # Bloque que muestra cada fila
+        self.block_top = 0  # Posición del bloque que muestra la primera fila
+        self.selected_blocks = set()
+        # Contadores del buffer de la vista (añadidas al final, al principio y sustituidas)
+        # con los que se actualizó la lista de bloques por última vez
+        self.blocks_synced = (0, 0, 0)
         self.original_title = "WordPress Debug Viewer"
         self.is_flashing = False
-        self.flash_thread = None
+        self.flash_job = None
+        # Cola entre el hilo que lee el debug.log y el hilo principal de Tk
+        self.update_queue = UpdateQueue()
+        self.update_job = None
         self.selection_mode = False
-        self.current_content = ""
+        # Cada vista solo se pinta mientras está delante: los cambios del área de texto
+        # oculta se guardan para aplicarlos al volver a ella (o se repinta entera si text_dirty)
+        self.pending_text_updates = []
+        self.pending_folded = {}  # Entradas agrupadas cuya nota hay que poner al día
+        self.text_dirty = False
+        # Entradas que conserva la vista; el archivo en disco sigue siendo la referencia completa
+        self.view_buffer = RetentionBuffer(
+            getattr(config, 'retention_max_entries', 0),
+            int(getattr(config, 'retention_max_mb', 0) * 1024 * 1024),
+            getattr(config, 'fold_duplicates', False))
+        # Entrada agrupada -> (marca del widget delante de su nota, longitud de la nota)
+        self.fold_marks = {}
+        self.fold_mark_count = 0
         self.is_paused = False  # Estado de pausa para congelar la actualización de logs
         self.pause_button = None  # Referencia al botón de pausa
+        # Niveles de error ocultos; se ocultan con etiquetas del widget, sin recorrer el texto
+        self.hidden_levels = set(getattr(config, 'hidden_levels', []))
+        self.level_vars = {}
+        self.level_checkboxes = {}
 
         # Variables para la búsqueda
         self.search_frame = None
         self.search_entry = None
         self.search_results_label = None
+        self.search_regex_var = None  # Buscar con expresión regular en lugar de texto literal
         self.search_matches = []
         self.current_match_index = -1
         self.is_search_visible = False
-        # Expresión regular para detectar bloques (líneas que comienzan con corchetes)
-        self.block_pattern = re.compile(r'^\[.*?\]', re.MULTILINE)
+        self.search_query = None  # Consulta de la última búsqueda
+        self.search_key = None  # (texto, modo regex) de la última búsqueda
+        self.search_job = None  # Búsqueda que se está haciendo en otro hilo
+        self.search_poll_job = None
+        self.search_scroll = True  # Desplazarse hasta la primera coincidencia que llegue
+        self.search_dropped_lines = 0  # Líneas quitadas del principio desde que empezó la búsqueda
+        self.search_tail_matches = []  # Coincidencias del texto añadido mientras se busca
+
+    @property
+    def current_content(self):
+        """Contenido retenido en la vista"""
+        return self.view_buffer.get_text()
+
+    @current_content.setter
+    def current_content(self, content):
+        self.view_buffer.clear()
+        self.view_buffer.append(content)
+        self.view_buffer.trim()
+        self.rebuild_blocks()
 
     def request_wp_content_path(self):
         """Solicitar la ruta al directorio wp-content"""
@@ -154,6 +235,8 @@ class DebuggerGUI:
             text_scrollbar = ttk.Scrollbar(normal_tab, orient=tk.VERTICAL, command=self.text_widget.yview)
             text_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
             self.text_widget['yscrollcommand'] = text_scrollbar.set
+            self.configure_level_tags()
+            self.text_widget.tag_configure("fold_note", foreground=FOLD_NOTE_COLOR)
 
             # Pestaña para vista de selección
             selection_tab = ttk.Frame(notebook)
@@ -163,27 +246,17 @@ class DebuggerGUI:
             blocks_container = ttk.Frame(selection_tab)
             blocks_container.pack(fill=tk.BOTH, expand=True)
 
-            # Canvas y scrollbar para permitir desplazamiento
-            self.canvas = tk.Canvas(blocks_container, bg="#f8f9fa")
-            scrollbar = ttk.Scrollbar(blocks_container, orient=tk.VERTICAL, command=self.canvas.yview)
-
-            # Frame dentro del canvas para los bloques
-            self.blocks_frame = ttk.Frame(self.canvas)
-            self.blocks_frame.bind(
-                "<Configure>",
-                lambda _: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-            )
-
-            # Configurar el canvas
-            self.canvas.create_window((0, 0), window=self.blocks_frame, anchor="nw")
-            self.canvas.configure(yscrollcommand=scrollbar.set)
+            # La barra de desplazamiento mueve la lista por bloques, no por píxeles
+            self.blocks_scrollbar = ttk.Scrollbar(blocks_container, orient=tk.VERTICAL, command=self.scroll_blocks)
+            self.blocks_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-            # Empaquetar canvas y scrollbar
-            self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            # Área de las filas: su tamaño lo decide la ventana y no las filas que contiene
+            self.blocks_frame = ttk.Frame(blocks_container)
+            self.blocks_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+            self.blocks_frame.bind("<Configure>", self.on_blocks_configure)
 
             # Permitir desplazamiento con la rueda del ratón
-            self.canvas.bind_all("<MouseWheel>", lambda e: self.canvas.yview_scroll(int(-1*(e.delta/120)), "units"))
+            self.bind_block_mousewheel(self.blocks_frame)
 
             # Función para cambiar entre modos
             def on_tab_changed(event):
@@ -191,15 +264,28 @@ class DebuggerGUI:
                 tab_text = event.widget.tab(tab, "text")
                 if tab_text == "Vista Normal":
                     self.selection_mode = False
+                    # Aplicar lo que cambió mientras estaba oculta
+                    self.show_text()
                 else:
                     self.selection_mode = True
-                    # Actualizar la vista de selección si hay contenido
-                    if self.current_content:
-                        self.update_blocks(self.split_into_blocks(self.current_content))
+                    # Pintar solo las filas visibles de la vista de selección
+                    if self.view_buffer.entries:
+                        self.show_blocks()
 
             # Vincular evento de cambio de pestaña
             notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
 
+            # Filtro por nivel de error, con el número de entradas de cada nivel en la vista
+            level_frame = ttk.Frame(main_frame)
+            level_frame.pack(fill=tk.X, pady=(10, 0))
+            ttk.Label(level_frame, text="Niveles:").pack(side=tk.LEFT, padx=5)
+            for level in LEVEL_ORDER:
+                self.level_vars[level] = tk.BooleanVar(value=level not in self.hidden_levels)
+                self.level_checkboxes[level] = ttk.Checkbutton(
+                    level_frame, text=LEVEL_LABELS[level], variable=self.level_vars[level],
+                    command=lambda l=level: self.toggle_level(l))
+                self.level_checkboxes[level].pack(side=tk.LEFT, padx=5)
+
             # Frame para botones
             button_frame = ttk.Frame(main_frame)
             button_frame.pack(fill=tk.X, pady=(10, 0))
@@ -211,6 +297,10 @@ class DebuggerGUI:
                       command=self.clear_content).pack(side=tk.LEFT, padx=5)
             ttk.Button(button_frame, text="Recargar",
                       command=self.reload_content).pack(side=tk.LEFT, padx=5)
+            ttk.Button(button_frame, text="Cargar anteriores",
+                      command=self.load_history).pack(side=tk.LEFT, padx=5)
+            ttk.Button(button_frame, text="Ir a fecha",
+                      command=self.jump_to_time).pack(side=tk.LEFT, padx=5)
 
             # Botón de pausa/reanudar
             self.pause_button = ttk.Button(button_frame, text="Pausar",
@@ -226,6 +316,10 @@ class DebuggerGUI:
             ttk.Button(button_frame, text="Abrir Carpeta",
                       command=self.open_folder).pack(side=tk.LEFT, padx=5)
 
+            # Estado de las tareas en segundo plano (por ejemplo, volver a aplicar filtros)
+            self.status_label = ttk.Label(button_frame, text="")
+            self.status_label.pack(side=tk.RIGHT, padx=5)
+
             # Botones para modo selección
             self.selection_buttons_frame = ttk.Frame(button_frame)
             self.selection_buttons_frame.pack(side=tk.LEFT)
@@ -243,100 +337,505 @@ class DebuggerGUI:
 
             self.is_window_open = True
 
+            # Empezar a volcar en la interfaz lo que llegue desde el hilo de lectura
+            self.update_job = self.root.after(1000 // MAX_UPDATES_PER_SECOND, self.process_update_queue)
+
             # Mostrar la ventana en primer plano
             self.root.lift()
             self.root.attributes('-topmost', True)
             self.root.after_idle(self.root.attributes, '-topmost', False)
 
-    def split_into_blocks(self, content):
-        """Dividir el contenido en bloques basados en líneas que comienzan con corchetes"""
-        if not content:
-            return []
+    def retained_start(self):
+        """Posición en el archivo desde la que la vista retiene las entradas (o None si no recortó nada)"""
+        # Con una sustitución de la vista pendiente, lo retenido ahora ya no cuenta
+        if self.update_queue.replacement is not None:
+            return None
+        return self.view_buffer.trimmed_to
+
+    def enqueue_content(self, content):
+        """Sustituir todo el contenido (seguro desde cualquier hilo)"""
+        self.update_queue.put_content(content)
+
+    def enqueue_append(self, content):
+        """Añadir contenido nuevo al final (seguro desde cualquier hilo)"""
+        self.update_queue.put_append(content)
+
+    def enqueue_prepend(self, content):
+        """Añadir entradas anteriores al principio (seguro desde cualquier hilo)"""
+        self.update_queue.put_prepend(content)
+
+    def enqueue_status(self, text):
+        """Mostrar un texto de estado (seguro desde cualquier hilo)"""
+        self.update_queue.put_status(text)
+
+    def enqueue_exceptions_changed(self):
+        """Pedir que se actualice la lista de excepciones (seguro desde cualquier hilo)"""
+        self.update_queue.put_exceptions_changed()
+
+    def enqueue_flash_title(self):
+        """Pedir que el título parpadee (seguro desde cualquier hilo)"""
+        self.update_queue.put_flash()
+
+    def process_update_queue(self):
+        """Aplicar por lotes, en el hilo principal, las actualizaciones pendientes"""
+        if not self.root:
+            return
+
+        try:
+            replacement, prepends, chunks, dropped, flash, status, exceptions_changed = self.update_queue.drain()
+
+            if replacement is not None:
+                self.update_content(replacement)
+
+            # Cada página de historial es anterior a la previa
+            for page in prepends:
+                self.prepend_content(page)
+
+            if dropped:
+                # Avisar de que parte del contenido no llegó a mostrarse
+                print(f"Cola de actualizaciones saturada. Caracteres descartados: {dropped}")
+                chunks.insert(0, LogEntry(text=f"\n[... {dropped} caracteres omitidos; consulte el archivo debug.log ...]\n"))
 
-        # Encontrar todas las posiciones donde comienzan los bloques
-        block_starts = [m.start() for m in self.block_pattern.finditer(content)]
+            if chunks:
+                self.append_content(chunks)
 
-        # Si no hay coincidencias, devolver todo el contenido como un solo bloque
-        if not block_starts:
-            return [content]
+            if replacement is not None or prepends or chunks:
+                self.update_level_counts()
 
-        # Crear los bloques
-        blocks = []
-        for i in range(len(block_starts)):
-            start = block_starts[i]
-            # Si es el último bloque, el final es el final del contenido
-            end = block_starts[i+1] if i < len(block_starts) - 1 else len(content)
-            block_content = content[start:end].strip()
-            if block_content:
-                blocks.append(block_content)
+            if flash:
+                self.flash_title()
 
-        return blocks
+            if status is not None and self.status_label:
+                self.status_label.configure(text=status)
+
+            if exceptions_changed and self.exceptions_listbox:
+                self.update_exceptions_list(self.exceptions_listbox)
+        except Exception as e:
+            print(f"Error al procesar las actualizaciones pendientes: {e}")
+
+        # Volver a programar el volcado con la frecuencia máxima permitida
+        if self.root:
+            self.update_job = self.root.after(1000 // MAX_UPDATES_PER_SECOND, self.process_update_queue)
+
+    def is_block(self, entry):
+        """Comprobar si una entrada se muestra como bloque en la vista de selección"""
+        return entry.level not in self.hidden_levels and entry.text and not entry.text.isspace()
+
+    def block_text(self, entry):
+        """Texto del bloque de una entrada, con la nota de repeticiones si está agrupada"""
+        block_content = entry.text.strip()
+        if entry.repeats > 1:
+            # La nota de repeticiones va al final de la primera línea, como en la vista normal
+            first_line, _, rest = block_content.partition('\n')
+            block_content = first_line + fold_note(entry) + ('\n' + rest if rest else "")
+        return block_content
+
+    def rebuild_blocks(self):
+        """Volver a calcular los bloques a partir de todas las entradas retenidas"""
+        self.blocks = [entry for entry in self.view_buffer.entries if self.is_block(entry)]
+        # Las entradas seleccionadas que siguen en la vista conservan su selección
+        self.selected_blocks &= set(self.blocks)
+        self.blocks_synced = (self.view_buffer.appended_entries, self.view_buffer.prepended_entries,
+                              self.view_buffer.replaced_entries)
+
+    def sync_blocks(self, dropped=()):
+        """Llevar a la lista de bloques los cambios del buffer de la vista sin recalcularla"""
+        buffer = self.view_buffer
+        appended, prepended, replaced = self.blocks_synced
+        if buffer.replaced_entries != replaced:
+            # La última entrada se sustituyó al volver a analizarla: caso raro, se recalcula
+            self.rebuild_blocks()
+            return
+
+        if dropped:
+            # Las entradas descartadas son siempre las más antiguas: los primeros bloques
+            dropped = set(dropped)
+            count = 0
+            while count < len(self.blocks) and self.blocks[count] in dropped:
+                count += 1
+            del self.blocks[:count]
+            self.selected_blocks -= dropped
+            self.block_top = max(0, self.block_top - count)
+
+        # Las entradas nuevas están en los extremos del buffer; si el recorte descartó
+        # alguna, ya no está entre las retenidas
+        new_count = min(buffer.appended_entries - appended, len(buffer.entries))
+        if new_count:
+            new_entries = list(islice(reversed(buffer.entries), new_count))
+            new_entries.reverse()
+            self.blocks.extend(entry for entry in new_entries if self.is_block(entry))
+        new_count = min(buffer.prepended_entries - prepended, len(buffer.entries))
+        if new_count:
+            new_blocks = [entry for entry in islice(buffer.entries, new_count) if self.is_block(entry)]
+            self.blocks[:0] = new_blocks
+            # La lista sigue mostrando los mismos bloques que antes
+            self.block_top += len(new_blocks)
+        self.blocks_synced = (buffer.appended_entries, buffer.prepended_entries, buffer.replaced_entries)
 
     def update_content(self, content):
-        """Actualizar el contenido en la interfaz (modo normal)"""
+        """Actualizar el contenido en la interfaz (modo normal); content son entradas o texto"""
         if not self.is_window_open:
             self.create_window()
 
+        # Guardar el contenido actual (solo lo que permite la retención de la vista)
+        self.current_content = content
+        content = self.current_content
+
         # Imprimir información de diagnóstico
         print(f"Actualizando contenido. Tamaño: {len(content)} bytes")
 
-        # Si está en pausa, no actualizar la interfaz pero guardar el contenido
+        # Si está en pausa, no actualizar la interfaz; el contenido se muestra al reanudar
         if self.is_paused:
             print("Actualización pausada. El contenido se mostrará al reanudar.")
-            self.current_content = content
             return
 
-        # Guardar el contenido actual
-        self.current_content = content
+        # Con la vista de selección delante, el área de texto oculta se repinta al volver a ella
+        if self.selection_mode:
+            self.mark_text_dirty()
+            self.show_blocks()
+            return
 
-        # Actualizar el área de texto en modo normal
+        self.render_content()
+
+    def render_content(self):
+        """Repintar todo el área de texto con el contenido retenido"""
+        self.text_dirty = False
+        self.pending_text_updates = []
+        self.pending_folded = {}
         if self.text_widget:
             try:
                 # Actualizar el contenido
                 self.text_widget.config(state=tk.NORMAL)
                 self.text_widget.delete(1.0, tk.END)
-                self.text_widget.insert(tk.END, content)
+                self.insert_entries(tk.END, self.view_buffer.entries)
+                self.render_fold_notes()
+
+                # Volver a buscar la misma consulta si la búsqueda está abierta, sin mover la vista
+                if self.is_search_visible and self.search_entry:
+                    self.start_search(scroll=False)
 
                 # Imprimir información de diagnóstico
                 print(f"Contenido insertado en el widget. Tamaño del widget: {len(self.text_widget.get(1.0, tk.END))} bytes")
 
-                # Resaltar el último mensaje si hay contenido
-                if content.strip():
-                    lines = content.split('\n')
-                    last_line_index = len(lines) - 1
+                # Resaltar el último mensaje si hay contenido; tras saltar a una fecha se muestra el principio
+                self.highlight_last_line(scroll=not self.scroll_to_top_pending)
+                if self.scroll_to_top_pending:
+                    self.scroll_to_top_pending = False
+                    self.text_widget.see("1.0")
+            except Exception as e:
+                print(f"Error al actualizar el contenido: {e}")
+            finally:
+                self.text_widget.config(state=tk.DISABLED)
+
+    def append_content(self, entries):
+        """Añadir entradas nuevas al final de la interfaz sin repintar lo ya mostrado"""
+        if not entries:
+            return
+
+        if not self.is_window_open:
+            self.create_window()
+
+        # Guardar el contenido; si está en pausa se mostrará al reanudar.
+        # No se recorta mientras se revisa el historial, salvo que se duplique el límite
+        following = self.is_following_end()
+        # Nivel de la última entrada mostrada, por si la primera nueva la continúa
+        previous_level = self.view_buffer.entries[-1].level if self.view_buffer.entries else LEVEL_CUSTOM
+        added, folded = self.view_buffer.append(entries)
+        # Si el fragmento completa una línea mostrada a medias, su nivel puede haber cambiado
+        rejoined = self.view_buffer.rejoined
+        rejoined_level = rejoined.level if rejoined else None
+        # El texto se toma ahora: la última entrada puede cambiar con el siguiente fragmento
+        runs = level_runs(added, rejoined_level or previous_level)
+        dropped = []
+        if following or self.view_buffer.is_over_limit(2):
+            dropped = self.view_buffer.trim_entries()
+        dropped_lines = sum(entry.line_count for entry in dropped)
+        # Los bloques nuevos se añaden a la lista y los descartados se quitan; el resto,
+        # y su selección, no cambian
+        self.sync_blocks(dropped)
+        if self.is_paused:
+            return
+
+        if self.selection_mode:
+            # El área de texto está oculta: el fragmento se inserta al volver a la vista normal
+            self.defer_text_update(folded, self.render_append, runs, (), dropped_lines, following,
+                                   rejoined_level)
+            self.show_blocks()
+            return
+
+        self.render_append(runs, folded, dropped_lines, following, rejoined_level)
+
+    def render_append(self, runs, folded, dropped_lines, following, rejoined_level=None):
+        """Insertar al final del área de texto las entradas añadidas y quitar las descartadas"""
+        if self.text_widget:
+            try:
+                self.text_widget.config(state=tk.NORMAL)
+
+                if dropped_lines:
+                    # Descartar del principio del widget las entradas que ya no se retienen
+                    self.text_widget.delete("1.0", f"{dropped_lines + 1}.0")
+                    self.shift_search_matches(dropped_lines)
+                    self.prune_fold_notes()
+
+                # Posición donde empieza el fragmento nuevo
+                append_start = self.text_widget.index("end-1c")
+                line, column = map(int, append_start.split('.'))
+                if rejoined_level and column:
+                    # La línea mostrada a medias es la misma entrada que continúa: se etiqueta
+                    # con el nivel que tiene ahora que su cabecera está completa
+                    for level in LEVEL_ORDER:
+                        self.text_widget.tag_remove(f"level_{level}", f"{line}.0", append_start)
+                    self.text_widget.tag_add(f"level_{rejoined_level}", f"{line}.0", append_start)
+
+                # Insertar solo el fragmento nuevo; las etiquetas existentes no se tocan
+                self.insert_runs(tk.END, runs)
+                self.update_fold_notes(folded)
+
+                # Buscar coincidencias únicamente en el texto añadido
+                if self.is_search_visible and self.search_query:
+                    # Incluir el principio de la línea en la que continúa el texto nuevo para
+                    # no perder coincidencias que cruzan el límite ni los campos de su cabecera
+                    prefix = self.text_widget.get(f"{line}.0", append_start) if column else ""
+                    new_matches = find_in_runs(runs, self.search_query, self.hidden_levels, line, column, prefix)
+                    if new_matches:
+                        self.tag_matches(new_matches)
+                        # Van detrás de las que aún está buscando el hilo, si hay una búsqueda en curso
+                        matches = self.search_tail_matches if self.search_job else self.search_matches
+                        # Una coincidencia que empezaba al final del texto anterior puede haber
+                        # crecido con el texto nuevo (por ejemplo, con una expresión regular)
+                        if matches and matches[-1][0] == new_matches[0][0]:
+                            matches.pop()
+                        matches.extend(new_matches)
+                        if not self.search_job:
+                            if self.current_match_index < 0:
+                                self.current_match_index = 0
+                                self.highlight_current_match()
+                            else:
+                                self.update_results_label()
+
+                # Mover el resaltado al último mensaje; desplazarse solo si ya se estaba viendo el final
+                self.text_widget.tag_remove("highlight", "1.0", tk.END)
+                self.highlight_last_line(scroll=following)
+            except Exception as e:
+                print(f"Error al añadir contenido: {e}")
+            finally:
+                self.text_widget.config(state=tk.DISABLED)
 
-                    # Encontrar la última línea no vacía
-                    while last_line_index >= 0 and not lines[last_line_index].strip():
-                        last_line_index -= 1
+    def prepend_content(self, entries):
+        """Añadir al principio de la interfaz entradas anteriores cargadas bajo demanda"""
+        if not entries:
+            return
 
-                    if last_line_index >= 0:
-                        # Calcular la posición de la última línea
-                        last_line_start = "1.0"
-                        for i in range(last_line_index):
-                            last_line_start = self.text_widget.index(f"{last_line_start}+1 line")
+        if not self.is_window_open:
+            self.create_window()
 
-                        last_line_end = f"{last_line_start}+{len(lines[last_line_index])}c"
+        added, folded = self.view_buffer.prepend(entries)
+        runs = level_runs(added)
+        self.sync_blocks()
+        if self.is_paused:
+            return
 
-                        # Configurar etiqueta para el fondo de color
-                        self.text_widget.tag_configure("highlight", background="#d4edda")
-                        self.text_widget.tag_add("highlight", last_line_start, last_line_end)
+        if self.selection_mode:
+            # El área de texto está oculta: el historial se inserta al volver a la vista normal
+            self.defer_text_update(folded, self.render_prepend, runs, ())
+            self.show_blocks()
+            return
 
-                        # Desplazarse hasta la última línea
-                        self.text_widget.see(last_line_end)
+        self.render_prepend(runs, folded)
 
-                        # Imprimir información de diagnóstico
-                        print(f"Última línea resaltada: '{lines[last_line_index]}'")
+    def render_prepend(self, runs, folded):
+        """Insertar al principio del área de texto las entradas anteriores cargadas"""
+        if self.text_widget:
+            try:
+                self.text_widget.config(state=tk.NORMAL)
+                added_lines = sum(text.count("\n") for _, text in runs)
+                self.insert_runs("1.0", runs)
+                self.update_fold_notes(folded)
+
+                # Las coincidencias existentes bajan tantas líneas como se añadieron
+                if added_lines:
+                    self.shift_search_matches(-added_lines)
+
+                # Buscar coincidencias únicamente en el texto añadido
+                if self.is_search_visible and self.search_query:
+                    new_matches = find_in_runs(runs, self.search_query, self.hidden_levels)
+                    if new_matches:
+                        self.tag_matches(new_matches)
+                        self.search_matches[:0] = new_matches
+                        if self.current_match_index >= 0:
+                            self.current_match_index += len(new_matches)
+                        self.update_results_label()
+
+                # Mostrar el final del historial cargado, justo antes de lo que ya se veía
+                self.text_widget.see(f"{added_lines + 1}.0")
             except Exception as e:
-                print(f"Error al actualizar el contenido: {e}")
+                print(f"Error al añadir el historial: {e}")
             finally:
                 self.text_widget.config(state=tk.DISABLED)
 
-        # Si estamos en modo selección, actualizar también los bloques
+    def mark_text_dirty(self):
+        """Marcar el área de texto oculta para repintarla entera al volver a la vista normal"""
+        self.text_dirty = True
+        self.pending_text_updates = []
+        self.pending_folded = {}
+
+    def defer_text_update(self, folded, update, *args):
+        """Guardar un cambio del área de texto oculta para aplicarlo al volver a la vista normal"""
+        if self.text_dirty:
+            return  # Se repintará entera
+        if len(self.pending_text_updates) >= MAX_PENDING_TEXT_UPDATES:
+            # Con tantos cambios acumulados es más barato repintar todo una vez
+            self.mark_text_dirty()
+            return
+        self.pending_text_updates.append((update, args))
+        # Las notas de repeticiones se localizan con las entradas retenidas, que ya van por
+        # delante del área de texto: se ponen al día después de aplicar todos los cambios
+        self.pending_folded.update(dict.fromkeys(folded))
+
+    def show_text(self):
+        """Poner al día el área de texto al volver a la vista normal; devolver True si la repintó entera"""
+        # En pausa el contenido se repinta entero al reanudar
+        if self.is_paused:
+            return False
+        if self.text_dirty:
+            self.render_content()
+            return True
+        # Aplicar en orden los cambios que llegaron mientras estaba oculta
+        pending = self.pending_text_updates
+        self.pending_text_updates = []
+        for update, args in pending:
+            update(*args)
+        if self.text_widget and self.pending_folded:
+            folded = [entry for entry in self.pending_folded if self.view_buffer.is_folded(entry)]
+            self.pending_folded = {}
+            self.update_fold_notes(folded)
+        return False
+
+    def configure_level_tags(self):
+        """Configurar la etiqueta de cada nivel: color y si está oculto"""
+        for level in LEVEL_ORDER:
+            tag = f"level_{level}"
+            if level in LEVEL_COLORS:
+                self.text_widget.tag_configure(tag, foreground=LEVEL_COLORS[level])
+            self.text_widget.tag_configure(tag, elide=level in self.hidden_levels)
+
+    def insert_entries(self, index, entries, level=LEVEL_CUSTOM):
+        """Insertar entradas en el área de texto con la etiqueta de su nivel"""
+        self.insert_runs(index, level_runs(entries, level))
+
+    def insert_runs(self, index, runs):
+        """Insertar tramos (nivel, texto) en el área de texto con la etiqueta de su nivel"""
+        # Una sola llamada a Tk con un tramo de texto por cada grupo de entradas del mismo nivel
+        args = []
+        for run_level, text in runs:
+            args.extend((text, f"level_{run_level}"))
+        if args:
+            self.text_widget.insert(index, *args)
+
+    def update_level_counts(self):
+        """Mostrar en el filtro de niveles cuántas entradas de cada nivel hay en la vista"""
+        for level, checkbox in self.level_checkboxes.items():
+            text = f"{LEVEL_LABELS[level]} ({self.view_buffer.level_counts.get(level, 0)})"
+            if checkbox.cget("text") != text:
+                checkbox.configure(text=text)
+
+    def toggle_level(self, level):
+        """Mostrar u ocultar las entradas de un nivel sin volver a recorrer el texto"""
+        if self.level_vars[level].get():
+            self.hidden_levels.discard(level)
+        else:
+            self.hidden_levels.add(level)
+        self.rebuild_blocks()
+        if self.config:
+            self.config.set_hidden_levels(hidden for hidden in LEVEL_ORDER if hidden in self.hidden_levels)
+
+        if self.text_widget:
+            self.text_widget.tag_configure(f"level_{level}", elide=level in self.hidden_levels)
+            # La búsqueda no encuentra el texto oculto: repetirla con lo que queda visible
+            if self.is_search_visible:
+                self.search_text()
+
         if self.selection_mode:
-            self.update_blocks(self.split_into_blocks(content))
+            self.show_blocks()
+
+    def render_fold_notes(self):
+        """Añadir la nota de repeticiones a todas las entradas agrupadas tras repintar la vista"""
+        for mark, _ in self.fold_marks.values():
+            self.text_widget.mark_unset(mark)
+        self.fold_marks = {}
+        line = 1
+        for entry in self.view_buffer.entries:
+            if entry.repeats > 1:
+                self.set_fold_note(entry, line)
+            line += entry.line_count
+
+    def update_fold_notes(self, folded):
+        """Actualizar la nota de las entradas agrupadas que han tenido repeticiones nuevas"""
+        pending = set()
+        for entry in folded:
+            if entry in self.fold_marks:
+                mark, length = self.fold_marks[entry]
+                self.text_widget.delete(mark, f"{mark}+{length}c")
+                self.insert_fold_note(entry, mark)
+            else:
+                pending.add(entry)
 
-    def update_blocks(self, blocks):
-        """Actualizar los bloques de log en la interfaz (modo selección)"""
+        # Las que se agrupan por primera vez se localizan en una sola pasada por la vista
+        line = 1
+        for entry in self.view_buffer.entries:
+            if not pending:
+                break
+            if entry in pending:
+                pending.discard(entry)
+                self.set_fold_note(entry, line)
+            line += entry.line_count
+
+    def set_fold_note(self, entry, line):
+        """Añadir la nota de repeticiones al final de la primera línea de una entrada"""
+        self.fold_mark_count += 1
+        mark = f"fold_{self.fold_mark_count}"
+        self.text_widget.mark_set(mark, f"{line}.0 lineend")
+        # La marca se queda delante de la nota para poder sustituirla cuando cambie
+        self.text_widget.mark_gravity(mark, tk.LEFT)
+        self.insert_fold_note(entry, mark)
+
+    def insert_fold_note(self, entry, mark):
+        """Insertar la nota de repeticiones de una entrada en su marca"""
+        note = fold_note(entry)
+        # La nota lleva la etiqueta del nivel para ocultarse junto con la entrada
+        self.text_widget.insert(mark, note, ("fold_note", f"level_{entry.level}"))
+        self.fold_marks[entry] = (mark, len(note))
+
+    def prune_fold_notes(self):
+        """Olvidar las marcas de las entradas agrupadas que ya no se retienen"""
+        for entry in [entry for entry in self.fold_marks if not self.view_buffer.is_folded(entry)]:
+            self.text_widget.mark_unset(self.fold_marks.pop(entry)[0])
+
+    def is_following_end(self):
+        """Comprobar si el área de texto muestra el final del contenido"""
+        if not self.text_widget:
+            return True
+        return self.text_widget.yview()[1] >= 1.0
+
+    def highlight_last_line(self, scroll=True):
+        """Resaltar la última línea no vacía y desplazarse hasta ella"""
+        # Una sola búsqueda hacia atrás desde el final del widget encuentra el último
+        # carácter visible, sin recorrer el contenido línea a línea
+        last_char = self.text_widget.search(r"\S", "end-1c", "1.0", backwards=True, regexp=True)
+        if last_char:
+            last_line_start = f"{last_char} linestart"
+            last_line_end = f"{last_char} lineend"
+
+            # Configurar etiqueta para el fondo de color
+            self.text_widget.tag_configure("highlight", background="#d4edda")
+            self.text_widget.tag_add("highlight", last_line_start, last_line_end)
+
+            # Desplazarse hasta la última línea
+            if scroll:
+                self.text_widget.see(last_line_end)
+
+    def show_blocks(self):
+        """Mostrar los bloques de log en la interfaz (modo selección)"""
         if not self.is_window_open:
             self.create_window()
 
@@ -345,44 +844,118 @@ class DebuggerGUI:
             print("Actualización de bloques pausada. Los bloques se mostrarán al reanudar.")
             return
 
-        # Guardar los bloques
-        self.blocks = blocks
-
-        # Limpiar los widgets existentes
-        for widget in self.block_widgets:
-            for w in widget:
-                w.destroy()
-        self.block_widgets = []
-
-        # Crear nuevos widgets para cada bloque
-        for block in blocks:
-            # Frame para el bloque
-            block_frame = ttk.Frame(self.blocks_frame)
-            block_frame.pack(fill=tk.X, pady=5, padx=5)
-
-            # Variable para el checkbox
-            var = tk.BooleanVar(value=False)
-
-            # Checkbox
-            checkbox = ttk.Checkbutton(block_frame, variable=var)
-            checkbox.pack(side=tk.LEFT, padx=(0, 5))
-
-            # Botón de copiar
-            copy_button = ttk.Button(
-                block_frame,
-                text="Copiar",
-                command=lambda b=block: self.copy_block(b)
-            )
-            copy_button.pack(side=tk.RIGHT, padx=5)
+        # Solo se repintan las filas visibles; las que muestran un bloque que no ha cambiado
+        # no se tocan
+        self.set_block_top(self.block_top, force=True)
+
+    def create_block_row(self):
+        """Crear una fila reutilizable de la lista de bloques"""
+        row = len(self.block_rows)
+        block_frame = ttk.Frame(self.blocks_frame)
+
+        # Variable para el checkbox (una por fila, no por bloque)
+        var = tk.BooleanVar(value=False)
+        checkbox = ttk.Checkbutton(block_frame, variable=var, command=lambda: self.toggle_block_selection(row))
+        checkbox.pack(side=tk.LEFT, padx=(0, 5))
+
+        # Botón de copiar
+        copy_button = ttk.Button(block_frame, text="Copiar", command=lambda: self.copy_block_row(row))
+        copy_button.pack(side=tk.RIGHT, padx=5)
+
+        # Área de texto para el contenido del bloque
+        text = tk.Text(block_frame, wrap=tk.WORD, height=5, width=80)
+        text.config(state=tk.DISABLED)  # Hacer el texto de solo lectura
+        text.pack(fill=tk.X, expand=True, padx=5, pady=5)
+
+        for widget in (block_frame, checkbox, copy_button, text):
+            self.bind_block_mousewheel(widget)
+        self.block_rows.append((block_frame, var, text))
+        self.block_row_blocks.append(None)
+
+    def bind_block_mousewheel(self, widget):
+        """Desplazar la lista de bloques con la rueda del ratón sobre widget"""
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            widget.bind(sequence, self.on_blocks_mousewheel)
+
+    def render_blocks(self):
+        """Mostrar en las filas existentes los bloques visibles a partir de block_top"""
+        for row, (block_frame, var, text) in enumerate(self.block_rows):
+            index = self.block_top + row
+            if index >= len(self.blocks):
+                if block_frame.winfo_manager():
+                    block_frame.place_forget()
+                self.block_row_blocks[row] = None
+                continue
+
+            # Reescribir el texto solo si la fila pasa a mostrar otro bloque o el suyo cambió
+            # (la última entrada sigue creciendo y las agrupadas suman repeticiones)
+            entry = self.blocks[index]
+            block = self.block_text(entry)
+            if self.block_row_blocks[row] != block:
+                text.config(state=tk.NORMAL)
+                text.delete("1.0", tk.END)
+                text.insert(tk.END, block)
+                text.config(state=tk.DISABLED)
+                text.see("1.0")
+                self.block_row_blocks[row] = block
+            var.set(entry in self.selected_blocks)
+            if not block_frame.winfo_manager():
+                block_frame.place(x=0, y=row * BLOCK_ROW_HEIGHT, relwidth=1, height=BLOCK_ROW_HEIGHT)
+
+    def visible_block_rows(self):
+        """Número de bloques que caben enteros en la lista"""
+        return max(1, self.blocks_frame.winfo_height() // BLOCK_ROW_HEIGHT)
+
+    def set_block_top(self, top, force=False):
+        """Mostrar la lista de bloques a partir del bloque top"""
+        top = max(0, min(top, len(self.blocks) - 1))
+        if top != self.block_top or force:
+            self.block_top = top
+            self.render_blocks()
+        # Barra de desplazamiento: fracción de la lista que queda a la vista
+        if self.blocks:
+            visible = self.visible_block_rows()
+            self.blocks_scrollbar.set(top / len(self.blocks), min(1.0, (top + visible) / len(self.blocks)))
+        else:
+            self.blocks_scrollbar.set(0.0, 1.0)
 
-            # Área de texto para el contenido del bloque
-            text = tk.Text(block_frame, wrap=tk.WORD, height=5, width=80)
-            text.insert(tk.END, block)
-            text.config(state=tk.DISABLED)  # Hacer el texto de solo lectura
-            text.pack(fill=tk.X, expand=True, padx=5)
+    def scroll_blocks(self, action, amount, unit="units"):
+        """Comando de la barra de desplazamiento de la lista de bloques"""
+        if action == "moveto":
+            self.set_block_top(int(float(amount) * len(self.blocks)))
+            return
+        step = 1 if float(amount) > 0 else -1
+        if unit == "pages":
+            step *= max(1, self.visible_block_rows() - 1)
+        self.set_block_top(self.block_top + step)
+
+    def on_blocks_mousewheel(self, event):
+        """Desplazar la lista de bloques un bloque por cada paso de la rueda"""
+        up = event.num == 4 or event.delta > 0
+        self.scroll_blocks("scroll", -1 if up else 1)
+        return "break"
+
+    def on_blocks_configure(self, event):
+        """Crear las filas que faltan para llenar la altura de la lista"""
+        needed = event.height // BLOCK_ROW_HEIGHT + 1
+        while len(self.block_rows) < needed:
+            self.create_block_row()
+        self.set_block_top(self.block_top, force=True)
+
+    def toggle_block_selection(self, row):
+        """Guardar la selección del bloque que muestra una fila"""
+        index = self.block_top + row
+        if index < len(self.blocks):
+            if self.block_rows[row][1].get():
+                self.selected_blocks.add(self.blocks[index])
+            else:
+                self.selected_blocks.discard(self.blocks[index])
 
-            # Guardar referencia a los widgets
-            self.block_widgets.append((block_frame, checkbox, var, text, copy_button))
+    def copy_block_row(self, row):
+        """Copiar el bloque que muestra una fila"""
+        index = self.block_top + row
+        if index < len(self.blocks):
+            self.copy_block(self.block_text(self.blocks[index]))
 
     def copy_all_content(self):
         """Copiar todo el contenido al portapapeles"""
@@ -399,10 +972,7 @@ class DebuggerGUI:
 
     def copy_selected_blocks(self):
         """Copiar todos los bloques seleccionados al portapapeles"""
-        selected_blocks = []
-        for _, _, var, text, _ in self.block_widgets:
-            if var.get():
-                selected_blocks.append(text.get(1.0, tk.END).strip())
+        selected_blocks = [self.block_text(entry) for entry in self.blocks if entry in self.selected_blocks]
 
         if not selected_blocks:
             messagebox.showinfo("Información", "No hay bloques seleccionados")
@@ -415,13 +985,13 @@ class DebuggerGUI:
 
     def select_all_blocks(self):
         """Seleccionar todos los bloques"""
-        for _, _, var, _, _ in self.block_widgets:
-            var.set(True)
+        self.selected_blocks = set(self.blocks)
+        self.render_blocks()
 
     def deselect_all_blocks(self):
         """Deseleccionar todos los bloques"""
-        for _, _, var, _, _ in self.block_widgets:
-            var.set(False)
+        self.selected_blocks = set()
+        self.render_blocks()
 
     def clear_content(self):
         """Borrar el contenido del archivo de log"""
@@ -433,6 +1003,28 @@ class DebuggerGUI:
         if self.on_reload_content:
             self.on_reload_content()
 
+    def load_history(self):
+        """Cargar las entradas anteriores a las que se muestran"""
+        if self.on_load_history:
+            self.on_load_history()
+
+    def jump_to_time(self):
+        """Pedir una fecha y mostrar las entradas a partir de ella"""
+        if not self.on_jump_to_time:
+            return
+
+        text = simpledialog.askstring("Ir a fecha",
+                                      "Fecha (por ejemplo 17-Oct-2026 10:00:00 o 2026-10-17 10:00):",
+                                      parent=self.root)
+        if not text:
+            return
+
+        self.scroll_to_top_pending = True
+        if not self.on_jump_to_time(text):
+            self.scroll_to_top_pending = False
+            messagebox.showinfo("Información", "No se encontraron entradas a partir de esa fecha.\n"
+                                "Si el archivo es muy grande, el índice puede estar aún en construcción.")
+
     def toggle_pause(self):
         """Alternar entre pausa y reanudar la actualización de logs"""
         self.is_paused = not self.is_paused
@@ -453,9 +1045,8 @@ class DebuggerGUI:
                 self.root.title(f"{self.original_title} [PAUSADO]")
             else:
                 self.root.title(self.original_title)
-                # Al reanudar, recargar el contenido para mostrar los cambios acumulados
-                if self.on_reload_content:
-                    self.on_reload_content()
+                # Al reanudar, repintar con el contenido acumulado durante la pausa
+                self.update_content(list(self.view_buffer.entries))
 
     def flash_title(self):
         """Hacer que el título de la ventana parpadee para indicar nuevos logs"""
@@ -463,38 +1054,37 @@ class DebuggerGUI:
             return
 
         self.is_flashing = True
+        self.flash_step(0)
 
-        def flash_task():
-            flash_count = 0
-            while flash_count < 6 and self.is_flashing:  # Parpadear 3 veces (6 cambios)
-                if flash_count % 2 == 0:
-                    # Si está pausado, incluir [PAUSADO] en el título
-                    if self.is_paused:
-                        self.root.title("¡NUEVO LOG! - " + self.original_title + " [PAUSADO]")
-                    else:
-                        self.root.title("¡NUEVO LOG! - " + self.original_title)
+    def flash_step(self, flash_count):
+        """Realizar un cambio del parpadeo del título (programado con root.after)"""
+        if not self.root:
+            self.is_flashing = False
+            return
+
+        if flash_count < 6 and self.is_flashing:  # Parpadear 3 veces (6 cambios)
+            if flash_count % 2 == 0:
+                # Si está pausado, incluir [PAUSADO] en el título
+                if self.is_paused:
+                    self.root.title("¡NUEVO LOG! - " + self.original_title + " [PAUSADO]")
                 else:
-                    # Restaurar el título adecuado según el estado de pausa
-                    if self.is_paused:
-                        self.root.title(self.original_title + " [PAUSADO]")
-                    else:
-                        self.root.title(self.original_title)
-                flash_count += 1
-                time.sleep(0.5)
-
-            # Restaurar el título original con el estado de pausa si corresponde
-            if self.root:
+                    self.root.title("¡NUEVO LOG! - " + self.original_title)
+            else:
+                # Restaurar el título adecuado según el estado de pausa
                 if self.is_paused:
                     self.root.title(self.original_title + " [PAUSADO]")
                 else:
                     self.root.title(self.original_title)
-            self.is_flashing = False
+            self.flash_job = self.root.after(500, self.flash_step, flash_count + 1)
+            return
 
-        # Iniciar el parpadeo en un hilo separado
-        if self.flash_thread is None or not self.flash_thread.is_alive():
-            self.flash_thread = threading.Thread(target=flash_task)
-            self.flash_thread.daemon = True
-            self.flash_thread.start()
+        # Restaurar el título original con el estado de pausa si corresponde
+        if self.is_paused:
+            self.root.title(self.original_title + " [PAUSADO]")
+        else:
+            self.root.title(self.original_title)
+        self.flash_job = None
+        self.is_flashing = False
 
     def show_exceptions_manager(self):
         """Mostrar la ventana de gestión de excepciones"""
@@ -551,7 +1141,9 @@ class DebuggerGUI:
         exceptions_listbox['yscrollcommand'] = scrollbar.set
 
         # Cargar las excepciones existentes
+        self.exceptions_listbox = exceptions_listbox
         self.update_exceptions_list(exceptions_listbox)
+        self.exceptions_stats_job = self.root.after(EXCEPTIONS_STATS_INTERVAL_MS, self.refresh_exceptions_stats)
 
         # Frame para botones
         button_frame = ttk.Frame(main_frame)
@@ -562,6 +1154,8 @@ class DebuggerGUI:
                   command=lambda: self.remove_exception(exceptions_listbox)).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Eliminar Todas",
                   command=lambda: self.clear_exceptions(exceptions_listbox)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Reactivar Seleccionada",
+                  command=lambda: self.release_exception(exceptions_listbox)).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Cerrar",
                   command=self.close_exceptions_window).pack(side=tk.RIGHT, padx=5)
 
@@ -570,20 +1164,81 @@ class DebuggerGUI:
         if not self.config:
             return
 
-        # Limpiar la lista
+        # Limpiar la lista, conservando la selección y el desplazamiento
+        selection = listbox.curselection()
+        top = listbox.yview()[0]
         listbox.delete(0, tk.END)
 
-        # Añadir cada excepción
+        # Añadir cada excepción con sus cifras, indicando las desactivadas por superar el límite de tiempo
         for regex in self.config.regex_exceptions:
-            listbox.insert(tk.END, regex)
+            reason = self.config.quarantined_exceptions.get(regex)
+            text = f"{regex}    {self.describe_exception_stats(regex)}"
+            listbox.insert(tk.END, f"{text}    [EN CUARENTENA: {reason}]" if reason else text)
+            if reason:
+                listbox.itemconfigure(tk.END, foreground="#e06c75")
+
+        for index in selection:
+            if index < listbox.size():
+                listbox.selection_set(index)
+        listbox.yview_moveto(top)
+
+    def describe_exception_stats(self, regex):
+        """Resumir las coincidencias, los bytes suprimidos y el tiempo de evaluación de una excepción"""
+        hits, size, seconds = self.config.get_exception_stats(regex)
+        if size >= 1024 * 1024:
+            size_text = f"{size / (1024 * 1024):.1f} MB"
+        elif size >= 1024:
+            size_text = f"{size / 1024:.1f} KB"
+        else:
+            size_text = f"{size} B"
+        return f"[{hits} coincidencias, {size_text} suprimidos, {seconds * 1000:.0f} ms]"
+
+    def refresh_exceptions_stats(self):
+        """Actualizar periódicamente las cifras mientras la ventana de excepciones está abierta"""
+        self.exceptions_stats_job = None
+        if not self.exceptions_window or not self.exceptions_listbox:
+            return
+        self.update_exceptions_list(self.exceptions_listbox)
+        self.exceptions_stats_job = self.root.after(EXCEPTIONS_STATS_INTERVAL_MS, self.refresh_exceptions_stats)
 
     def add_exception(self, regex_pattern):
         """Añadir una nueva excepción"""
         if not self.config or not regex_pattern.strip():
             return
+        if self.exception_check:
+            messagebox.showinfo("Información", "Espera a que termine la comprobación de la excepción anterior")
+            return
+
+        # Rechazar las expresiones no válidas o con retroceso catastrófico antes de usarlas. La prueba
+        # espera al filtrado en curso y puede arrancar el proceso auxiliar, así que va en otro hilo
+        regex_pattern = regex_pattern.strip()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(self.config.check_regex_exception(regex_pattern)))
+        thread.daemon = True
+        thread.start()
+        self.exception_check = (thread, regex_pattern, result)
+        self.enqueue_status("Comprobando la excepción...")
+        self.exception_check_job = self.root.after(EXCEPTION_CHECK_POLL_MS, self.poll_exception_check)
+
+    def poll_exception_check(self):
+        """Terminar de añadir la excepción cuando acabe su comprobación"""
+        self.exception_check_job = None
+        thread, regex_pattern, result = self.exception_check
+        if thread.is_alive():
+            self.exception_check_job = self.root.after(EXCEPTION_CHECK_POLL_MS, self.poll_exception_check)
+            return
+        self.exception_check = None
+        self.enqueue_status("")
+        self.finish_add_exception(regex_pattern, result[0] if result else "No se pudo comprobar la expresión.")
+
+    def finish_add_exception(self, regex_pattern, reason):
+        """Añadir una excepción ya comprobada, o mostrar el motivo del rechazo"""
+        if reason:
+            messagebox.showerror("Error", f"No se pudo añadir la excepción. {reason}")
+            return
 
         # Intentar añadir la excepción
-        if self.config.add_regex_exception(regex_pattern.strip()):
+        if self.config.add_regex_exception(regex_pattern):
             # Actualizar la lista en la interfaz
             if self.exceptions_window:
                 for widget in self.exceptions_window.winfo_children():
@@ -595,6 +1250,9 @@ class DebuggerGUI:
                                         self.update_exceptions_list(grandchild)
                                         break
 
+            # Volver a mostrar el contenido con el nuevo conjunto de filtros
+            self.on_filters_changed()
+
             # Mostrar mensaje de éxito
             messagebox.showinfo("Éxito", f"Excepción '{regex_pattern}' añadida correctamente")
         else:
@@ -612,17 +1270,43 @@ class DebuggerGUI:
             messagebox.showinfo("Información", "No hay ninguna excepción seleccionada")
             return
 
-        # Obtener el patrón seleccionado
-        regex_pattern = listbox.get(selection[0])
+        # Obtener el patrón seleccionado (el texto de la lista puede incluir el aviso de cuarentena)
+        regex_pattern = self.config.regex_exceptions[selection[0]]
 
         # Eliminar la excepción
         if self.config.remove_regex_exception(regex_pattern):
             # Actualizar la lista
             self.update_exceptions_list(listbox)
 
+            # Volver a mostrar el contenido con el nuevo conjunto de filtros
+            self.on_filters_changed()
+
             # Mostrar mensaje de éxito
             messagebox.showinfo("Éxito", f"Excepción '{regex_pattern}' eliminada correctamente")
 
+    def release_exception(self, listbox):
+        """Volver a activar la excepción seleccionada si estaba en cuarentena"""
+        if not self.config:
+            return
+
+        # Obtener la selección
+        selection = listbox.curselection()
+        if not selection:
+            messagebox.showinfo("Información", "No hay ninguna excepción seleccionada")
+            return
+
+        regex_pattern = self.config.regex_exceptions[selection[0]]
+        if self.config.release_regex_exception(regex_pattern):
+            # Actualizar la lista
+            self.update_exceptions_list(listbox)
+
+            # Volver a mostrar el contenido con el nuevo conjunto de filtros
+            self.on_filters_changed()
+
+            messagebox.showinfo("Éxito", f"Excepción '{regex_pattern}' reactivada")
+        else:
+            messagebox.showinfo("Información", f"La excepción '{regex_pattern}' no está en cuarentena")
+
     def clear_exceptions(self, listbox):
         """Eliminar todas las excepciones"""
         if not self.config:
@@ -636,14 +1320,30 @@ class DebuggerGUI:
             # Actualizar la lista
             self.update_exceptions_list(listbox)
 
+            # Volver a mostrar el contenido con el nuevo conjunto de filtros
+            self.on_filters_changed()
+
             # Mostrar mensaje de éxito
             messagebox.showinfo("Éxito", "Todas las excepciones han sido eliminadas")
 
+    def on_filters_changed(self):
+        """Volver a filtrar todo el contenido cuando cambia el conjunto de filtros"""
+        # Lo mostrado ya está filtrado con los patrones anteriores, así que se vuelve a leer
+        # del archivo; el trabajo se hace en segundo plano para no bloquear la interfaz
+        if self.on_refilter_content:
+            self.on_refilter_content()
+        else:
+            self.reload_content()
+
     def close_exceptions_window(self):
         """Cerrar la ventana de excepciones"""
+        if self.exceptions_stats_job:
+            self.root.after_cancel(self.exceptions_stats_job)
+            self.exceptions_stats_job = None
         if self.exceptions_window:
             self.exceptions_window.destroy()
             self.exceptions_window = None
+            self.exceptions_listbox = None
 
     def close_window(self):
         """Cerrar completamente la aplicación"""
@@ -657,6 +1357,20 @@ class DebuggerGUI:
                     self.exceptions_window.destroy()
                     self.exceptions_window = None
 
+                # Detener la búsqueda en curso
+                self.cancel_search()
+
+                # Detener las tareas programadas sobre la ventana principal
+                for job in (self.update_job, self.flash_job, self.exceptions_stats_job, self.exception_check_job):
+                    if job:
+                        self.root.after_cancel(job)
+                self.update_job = None
+                self.flash_job = None
+                self.exceptions_stats_job = None
+                self.exception_check_job = None
+                self.exception_check = None
+                self.is_flashing = False
+
                 self.root.quit()
                 self.root.destroy()
                 self.root = None
@@ -834,7 +1548,7 @@ class DebuggerGUI:
         if not self.search_frame:
             # Crear el frame de búsqueda
             self.search_frame = ttk.Frame(self.root)
-            self.search_frame.place(relx=1.0, y=10, anchor="ne", relwidth=0.3, height=40)
+            self.search_frame.place(relx=1.0, y=10, anchor="ne", relwidth=0.4, height=40)
 
             # Campo de entrada para la búsqueda
             self.search_entry = ttk.Entry(self.search_frame)
@@ -845,6 +1559,12 @@ class DebuggerGUI:
             # Buscar mientras se escribe
             self.search_entry.bind("<KeyRelease>", self.search_text)
 
+            # Buscar con expresión regular en lugar de texto literal
+            self.search_regex_var = tk.BooleanVar(value=False)
+            regex_checkbox = ttk.Checkbutton(self.search_frame, text="Regex", variable=self.search_regex_var,
+                                             command=self.search_text)
+            regex_checkbox.pack(side=tk.LEFT, padx=5, pady=5)
+
             # Botones de navegación
             nav_frame = ttk.Frame(self.search_frame)
             nav_frame.pack(side=tk.LEFT, padx=5, pady=5)
@@ -865,7 +1585,7 @@ class DebuggerGUI:
             self.search_results_label = ttk.Label(self.search_frame, text="")
             self.search_results_label.pack(side=tk.LEFT, padx=5, pady=5)
         else:
-            self.search_frame.place(relx=1.0, y=10, anchor="ne", relwidth=0.3, height=40)
+            self.search_frame.place(relx=1.0, y=10, anchor="ne", relwidth=0.4, height=40)
 
         self.is_search_visible = True
 
@@ -891,58 +1611,133 @@ class DebuggerGUI:
         if self.search_frame:
             self.search_frame.place_forget()
 
-            # Eliminar resaltados de búsqueda
-            if self.text_widget:
-                self.text_widget.tag_remove("search", "1.0", tk.END)
-                self.text_widget.tag_remove("current_match", "1.0", tk.END)
+        # Detener la búsqueda en curso y eliminar los resaltados
+        try:
+            self.clear_search()
+        except Exception as e:
+            print(f"Error al eliminar resaltados: {e}")
 
         self.is_search_visible = False
+        self.search_query = None
+        self.search_key = None
+
+    def search_entries(self):
+        """Entradas en las que buscar, con las mismas líneas que el área de texto"""
+        if self.is_paused or self.text_dirty or self.pending_text_updates:
+            # El área de texto no está al día con las entradas retenidas (en pausa o con la
+            # vista oculta): se busca en su propio texto, obtenido en una sola llamada
+            return entries_from_text(self.text_widget.get("1.0", "end-1c"))
+        return self.view_buffer.entries
+
+    def clear_search(self):
+        """Detener la búsqueda en curso y quitar sus resaltados"""
+        self.cancel_search()
         self.search_matches = []
+        self.search_tail_matches = []
         self.current_match_index = -1
+        if self.text_widget:
+            self.text_widget.tag_remove("search", "1.0", tk.END)
+            self.text_widget.tag_remove("current_match", "1.0", tk.END)
+
+    def cancel_search(self):
+        """Detener el hilo de búsqueda y la recogida de sus resultados"""
+        if self.search_job:
+            self.search_job.cancel()
+            self.search_job = None
+        if self.search_poll_job and self.root:
+            self.root.after_cancel(self.search_poll_job)
+        self.search_poll_job = None
+
+    def start_search(self, scroll=True):
+        """Empezar a buscar en otro hilo la consulta escrita en el campo de búsqueda"""
+        self.clear_search()
+        self.search_query = None
+        try:
+            query = SearchQuery(self.search_entry.get(), self.search_regex_var.get())
+        except ValueError as e:
+            self.set_search_status(str(e))
+            return
+        if query.is_empty:
+            self.update_results_label()
+            return
 
-    def find_all_matches(self, search_term):
-        """Encontrar todas las coincidencias del término de búsqueda en el texto"""
-        if not search_term or not self.text_widget:
-            return []
-
-        matches = []
-        start_pos = "1.0"
-
-        while True:
-            # Buscar la siguiente coincidencia
-            pos = self.text_widget.search(search_term, start_pos, tk.END, nocase=True)
-            if not pos:
-                break
-
-            # Calcular la posición final de la coincidencia
-            end_pos = f"{pos}+{len(search_term)}c"
-
-            # Añadir a la lista de coincidencias
-            matches.append((pos, end_pos))
-
-            # Actualizar la posición de inicio para la siguiente búsqueda
-            start_pos = end_pos
+        # Configurar etiquetas para resaltado
+        self.text_widget.tag_configure("search", background="#FFFF00", foreground="#000000")
+        self.text_widget.tag_configure("current_match", background="#FF9900", foreground="#000000")
 
-        return matches
+        # Las coincidencias llegan por partes; la ventana sigue respondiendo mientras tanto
+        self.search_query = query
+        self.search_scroll = scroll
+        self.search_dropped_lines = 0
+        regex_guard = getattr(self.config, 'regex_guard', None)
+        self.search_job = SearchJob(query, snapshot_entries(self.search_entries()), self.hidden_levels, regex_guard)
+        self.search_job.start()
+        self.set_search_status("Buscando...")
+        self.poll_search()
+
+    def poll_search(self):
+        """Resaltar las coincidencias que ha encontrado hasta ahora la búsqueda en curso"""
+        self.search_poll_job = None
+        job = self.search_job
+        if not job:
+            return
 
-    def highlight_matches(self, matches):
-        """Resaltar todas las coincidencias encontradas"""
-        if not self.text_widget:
+        # Leer done antes de recoger: así no se pierden las últimas coincidencias
+        done = job.done
+        matches = job.take_matches()
+        if matches and self.search_dropped_lines:
+            # El área de texto cambió desde que empezó la búsqueda
+            matches = shift_matches(matches, self.search_dropped_lines)
+        if done:
+            matches.extend(self.search_tail_matches)
+            self.search_tail_matches = []
+        if matches:
+            self.tag_matches(matches)
+            self.search_matches.extend(matches)
+            if self.current_match_index < 0:
+                self.current_match_index = 0
+                self.highlight_current_match(scroll=self.search_scroll)
+
+        if not done:
+            self.set_search_status(f"Buscando... {len(self.search_matches)} ({int(job.progress() * 100)}%)")
+            if self.root:
+                self.search_poll_job = self.root.after(SEARCH_POLL_INTERVAL_MS, self.poll_search)
             return
 
-        # Eliminar resaltados anteriores
-        self.text_widget.tag_remove("search", "1.0", tk.END)
-        self.text_widget.tag_remove("current_match", "1.0", tk.END)
+        self.search_job = None
+        if job.error:
+            # Tampoco se busca la consulta en el texto que se vaya añadiendo
+            self.search_query = None
+            self.set_search_status(job.error)
+            return
+        self.update_results_label()
 
-        # Configurar etiquetas para resaltado
-        self.text_widget.tag_configure("search", background="#FFFF00", foreground="#000000")
-        self.text_widget.tag_configure("current_match", background="#FF9900", foreground="#000000")
+    def set_search_status(self, text):
+        """Mostrar un mensaje en la etiqueta de resultados de la búsqueda"""
+        if self.search_results_label:
+            self.search_results_label.configure(text=text)
+
+    def tag_matches(self, matches):
+        """Marcar coincidencias con la etiqueta de búsqueda en una sola llamada a Tk"""
+        self.text_widget.tag_add("search", *[index for match in matches for index in match])
+
+    def shift_search_matches(self, dropped_lines):
+        """Ajustar las coincidencias guardadas tras eliminar líneas del principio del widget"""
+        # Las que aún no ha entregado el hilo de búsqueda se ajustan al recogerlas
+        if self.search_job:
+            self.search_dropped_lines += dropped_lines
+            self.search_tail_matches = shift_matches(self.search_tail_matches, dropped_lines)
+        if not self.search_matches:
+            return
 
-        # Resaltar todas las coincidencias
-        for start_pos, end_pos in matches:
-            self.text_widget.tag_add("search", start_pos, end_pos)
+        shifted = shift_matches(self.search_matches, dropped_lines)
+        removed = len(self.search_matches) - len(shifted)
+        self.search_matches = shifted
+        if self.current_match_index >= 0:
+            self.current_match_index = max(0, self.current_match_index - removed) if shifted else -1
+        self.update_results_label()
 
-    def highlight_current_match(self):
+    def highlight_current_match(self, scroll=True):
         """Resaltar la coincidencia actual"""
         if not self.search_matches or self.current_match_index < 0:
             return
@@ -955,7 +1750,8 @@ class DebuggerGUI:
         self.text_widget.tag_add("current_match", start_pos, end_pos)
 
         # Desplazarse hasta la coincidencia
-        self.text_widget.see(start_pos)
+        if scroll:
+            self.text_widget.see(start_pos)
 
         # Actualizar la etiqueta de resultados
         self.update_results_label()
@@ -977,26 +1773,22 @@ class DebuggerGUI:
         if not self.search_entry or not self.text_widget:
             return
 
-        search_term = self.search_entry.get()
-        if not search_term:
-            self.search_matches = []
-            self.current_match_index = -1
-            self.update_results_label()
+        # Las teclas que no cambian la consulta (flechas, Intro...) no repiten la búsqueda
+        search_key = (self.search_entry.get(), self.search_regex_var.get())
+        if event is not None and search_key == self.search_key:
+            return
+        self.search_key = search_key
+
+        # Poner al día el área de texto si cambió mientras estaba oculta. Al repintarla entera
+        # ya empieza de nuevo la búsqueda: solo falta llevar la vista a la primera coincidencia
+        if self.show_text() and self.is_search_visible:
+            self.search_scroll = True
+            if not self.search_job and self.current_match_index >= 0:
+                self.highlight_current_match(scroll=True)
             return
 
-        # Encontrar todas las coincidencias
-        self.search_matches = self.find_all_matches(search_term)
-
-        # Resaltar todas las coincidencias
-        self.highlight_matches(self.search_matches)
-
-        # Establecer la coincidencia actual
-        if self.search_matches:
-            self.current_match_index = 0
-            self.highlight_current_match()
-        else:
-            self.current_match_index = -1
-            self.update_results_label()
+        # Buscar en otro hilo; la primera coincidencia se muestra en cuanto aparece
+        self.start_search()
 
     def search_next(self, event=None):
         """Buscar la siguiente coincidencia"""
@@ -1004,13 +1796,9 @@ class DebuggerGUI:
             return
 
         # Si es la primera búsqueda o se cambió el término, buscar desde el principio
-        current_search_term = self.search_entry.get()
-        if not self.search_matches or current_search_term != self.search_entry.get():
-            self.search_text()
-            return
-
-        # Si no hay coincidencias, no hacer nada
         if not self.search_matches:
+            if not self.search_job:
+                self.search_text()
             return
 
         # Avanzar al siguiente resultado
@@ -1023,13 +1811,9 @@ class DebuggerGUI:
             return
 
         # Si es la primera búsqueda o se cambió el término, buscar desde el principio
-        current_search_term = self.search_entry.get()
-        if not self.search_matches or current_search_term != self.search_entry.get():
-            self.search_text()
-            return
-
-        # Si no hay coincidencias, no hacer nada
         if not self.search_matches:
+            if not self.search_job:
+                self.search_text()
             return
 
         # Retroceder al resultado anterior
@@ -0,0 +1,281 @@
+"""
+WordPress Debug Viewer - Entradas del log segmentadas una sola vez y decodificadas bajo demanda
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import calendar
+import re
+
+# Inicio de una entrada: línea que comienza con corchetes ("[...]" en la misma línea)
+ENTRY_START_PATTERN = re.compile(r'^\[.*?\]', re.MULTILINE)
+ENTRY_START_BYTES_PATTERN = re.compile(rb'^\[[^\n]*?\]', re.MULTILINE)
+
+# Marca de tiempo de WordPress al inicio de cada entrada: [17-Oct-2026 10:11:12 UTC]
+DATE_PATTERN = re.compile(rb'(\d{1,2})-([A-Za-z]{3})-(\d{4})\Z')
+MONTHS = {b'Jan': 1, b'Feb': 2, b'Mar': 3, b'Apr': 4, b'May': 5, b'Jun': 6,
+          b'Jul': 7, b'Aug': 8, b'Sep': 9, b'Oct': 10, b'Nov': 11, b'Dec': 12}
+# Fechas distintas que recuerda el analizador de marcas de tiempo antes de vaciar su caché
+MAX_CACHED_DATES = 4096
+
+# Longitud de la cabecera que se examina para extraer la marca de tiempo y el nivel
+TIMESTAMP_HEADER_SIZE = 40
+HEADER_SIZE = 80
+
+# Nivel según el prefijo que escribe PHP tras la marca de tiempo; el resto de entradas
+# (error_log() de plugins y temas) son de nivel personalizado
+LEVEL_PATTERN = re.compile(rb'\][^\S\n]*PHP (Fatal error|Parse error|Recoverable fatal error|'
+                           rb'Warning|Notice|Deprecated|Strict Standards)')
+LEVELS = {b'Fatal error': 'Fatal', b'Parse error': 'Fatal', b'Recoverable fatal error': 'Fatal',
+          b'Warning': 'Warning', b'Notice': 'Notice', b'Deprecated': 'Deprecated',
+          b'Strict Standards': 'Notice'}
+LEVEL_CUSTOM = 'Custom'
+# Niveles en orden de gravedad
+LEVEL_ORDER = ('Fatal', 'Warning', 'Notice', 'Deprecated', LEVEL_CUSTOM)
+
+ENCODING = 'utf-8'
+
+
+class TimestampParser:
+    """Convertir cabeceras "[DD-Mon-YYYY HH:MM:SS UTC]" en segundos UTC reutilizando la fecha ya analizada"""
+
+    def __init__(self):
+        self.dates = {}  # b'17-Oct-2026' -> segundos UTC de las 00:00 de ese día
+        # Último minuto analizado (b'17-Oct-2026 10:11', segundos UTC): las entradas
+        # consecutivas suelen compartirlo. Se guarda como una tupla para cambiarlo de una vez
+        # aunque otro hilo esté analizando al mismo tiempo
+        self.last_minute = (None, None)
+
+    def parse(self, header):
+        """Segundos UTC de la cabecera de una entrada (o None si no empieza con una marca de tiempo)"""
+        if header[:1] != b'[':
+            return None
+        # El día puede tener una o dos cifras: el espacio tras la fecha está en la posición 11 o 12
+        space = header.find(b' ', 11, 13)
+        if space < 0:
+            return None
+        seconds = header[space + 7:space + 9]
+        if len(seconds) != 2 or not seconds.isdigit() or header[space + 6:space + 7] != b':':
+            return None
+
+        minute_key = header[1:space + 6]
+        last_key, last_value = self.last_minute
+        if minute_key == last_key:
+            return last_value + int(seconds)
+
+        hour = header[space + 1:space + 3]
+        minute = header[space + 4:space + 6]
+        if not (hour.isdigit() and minute.isdigit() and header[space + 3:space + 4] == b':'):
+            return None
+        day_start = self._parse_date(header[1:space])
+        if day_start is None:
+            return None
+
+        minute_value = day_start + int(hour) * 3600 + int(minute) * 60
+        self.last_minute = (minute_key, minute_value)
+        return minute_value + int(seconds)
+
+    def _parse_date(self, date):
+        """Segundos UTC del comienzo del día "DD-Mon-YYYY" (o None si no es una fecha)"""
+        day_start = self.dates.get(date)
+        if day_start is not None:
+            return day_start
+        match = DATE_PATTERN.match(date)
+        if not match:
+            return None
+        day, month, year = match.groups()
+        month = MONTHS.get(month.capitalize())
+        if not month:
+            return None
+        # WordPress escribe las fechas del log en UTC
+        day_start = float(calendar.timegm((int(year), month, int(day), 0, 0, 0)))
+        if len(self.dates) >= MAX_CACHED_DATES:
+            self.dates.clear()
+        self.dates[date] = day_start
+        return day_start
+
+
+# Analizador compartido por el índice, el seguimiento del archivo y las entradas
+timestamp_parser = TimestampParser()
+
+
+def parse_timestamp(header):
+    """Convertir la cabecera de una entrada en segundos desde la época (o None)"""
+    return timestamp_parser.parse(header)
+
+
+def lowercase(text):
+    """Texto en minúsculas con la misma longitud, para que sus posiciones sigan valiendo"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Algunos caracteres (como "İ") se alargan al pasarlos a minúsculas: se dejan tal cual
+        lowered = "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+    return lowered
+
+
+def parse_level(header):
+    """Nivel de una entrada a partir de su cabecera"""
+    match = LEVEL_PATTERN.search(header)
+    return LEVELS[match.group(1)] if match else LEVEL_CUSTOM
+
+
+class LogEntry:
+    """Una entrada del log: su posición en el archivo y su texto, decodificado solo cuando se pide"""
+
+    __slots__ = ('offset', 'length', 'continued', '_raw', '_text', '_timestamp', '_level', '_line_count',
+                 '_lowercase', 'repeats', 'first_seen', 'last_seen')
+
+    def __init__(self, offset=None, raw=None, text=None, continued=False):
+        self.offset = offset  # Posición en bytes en el archivo (None si no procede del archivo)
+        self.length = len(raw) if raw is not None else None  # Bytes que ocupa en el archivo
+        self.continued = continued  # Continúa la entrada anterior (no empieza con una cabecera)
+        self._raw = raw  # Bytes sin decodificar; se liberan al decodificar
+        self._text = text
+        self._timestamp = None
+        self._level = None
+        self._line_count = None
+        self._lowercase = None
+        self.repeats = 1  # Veces que se ha visto el mensaje (al agrupar las repeticiones)
+        self.first_seen = None  # Marcas de tiempo de la primera y la última repetición
+        self.last_seen = None
+
+    @property
+    def text(self):
+        """Texto de la entrada (se decodifica la primera vez que se pide)"""
+        if self._text is None:
+            self._text = str(self._raw, ENCODING, errors='ignore') if self._raw else ""
+            self._raw = None
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        self._text = text
+        self._raw = None
+        self._line_count = None
+        self._lowercase = None
+
+    @property
+    def header(self):
+        """Primeros bytes de la entrada, sin decodificar el resto"""
+        if self._raw is not None:
+            return self._raw[:HEADER_SIZE]
+        return self.text[:HEADER_SIZE].encode(ENCODING, errors='ignore')
+
+    @property
+    def timestamp(self):
+        """Marca de tiempo de la cabecera en segundos UTC (o None)"""
+        if self._timestamp is None and not self.continued:
+            self._timestamp = parse_timestamp(self.header[:TIMESTAMP_HEADER_SIZE])
+        return self._timestamp
+
+    @property
+    def level(self):
+        """Nivel de la entrada: Fatal, Warning, Notice, Deprecated o Custom"""
+        if self._level is None:
+            self._level = parse_level(self.header)
+        return self._level
+
+    @property
+    def line_count(self):
+        """Número de saltos de línea de la entrada"""
+        if self._line_count is None:
+            if self._raw is not None:
+                self._line_count = self._raw.count(b'\n')
+            else:
+                self._line_count = self.text.count('\n')
+        return self._line_count
+
+    @property
+    def lowercase_text(self):
+        """Texto en minúsculas para buscar (se calcula la primera vez que se pide y se guarda)"""
+        if self._lowercase is None:
+            self._lowercase = lowercase(self.text)
+        return self._lowercase
+
+    def extend(self, other):
+        """Añadir al final el texto de una entrada que continúa a esta"""
+        self.text = self.text + other.text
+        if self.length is not None and other.length is not None:
+            self.length += other.length
+
+
+def split_entries(data, offset=0, at_line_start=True):
+    """Segmentar bytes del log en entradas; offset es la posición de data en el archivo"""
+    if not data:
+        return []
+    starts = [m.start() for m in ENTRY_START_BYTES_PATTERN.finditer(data)]
+    if starts and starts[0] == 0 and not at_line_start:
+        # data empieza a mitad de una línea: el corchete no abre una entrada
+        starts.pop(0)
+
+    entries = []
+    if not starts or starts[0] > 0:
+        # Los bytes anteriores a la primera cabecera continúan la entrada anterior
+        head_end = starts[0] if starts else len(data)
+        entries.append(LogEntry(offset, data[:head_end], continued=True))
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(data)
+        entry = LogEntry(offset + start, data[start:end])
+        # Con la caché del analizador la fecha y el nivel de cada entrada se obtienen al
+        # segmentar, antes de que el filtrado pueda cambiar su texto
+        entry._timestamp = parse_timestamp(data[start:start + TIMESTAMP_HEADER_SIZE])
+        entry._level = parse_level(data[start:start + HEADER_SIZE])
+        entries.append(entry)
+    return entries
+
+
+def entries_from_text(text):
+    """Segmentar en entradas un texto ya decodificado (sin posición en el archivo)"""
+    if not text:
+        return []
+    starts = [m.start() for m in ENTRY_START_PATTERN.finditer(text)]
+    entries = []
+    if not starts or starts[0] > 0:
+        head_end = starts[0] if starts else len(text)
+        entries.append(LogEntry(text=text[:head_end], continued=True))
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        entries.append(LogEntry(text=text[start:end]))
+    return entries
+
+
+def as_entries(content):
+    """Aceptar texto o una lista de entradas y devolver siempre una lista de entradas"""
+    if isinstance(content, str):
+        return entries_from_text(content)
+    return list(content) if content else []
+
+
+def join_entries(entries):
+    """Texto completo de una secuencia de entradas"""
+    return "".join(entry.text for entry in entries)
+
+
+def level_runs(entries, level=LEVEL_CUSTOM):
+    """Agrupar entradas consecutivas del mismo nivel en tramos (nivel, texto)"""
+    # Las entradas que continúan a la anterior heredan su nivel; level es el de la
+    # entrada que precede a la primera
+    runs = []
+    texts = []
+    for entry in entries:
+        entry_level = level if entry.continued else entry.level
+        if entry_level != level and texts:
+            runs.append((level, "".join(texts)))
+            texts = []
+        level = entry_level
+        texts.append(entry.text)
+    if texts:
+        runs.append((level, "".join(texts)))
+    return runs
+
+
+def utf8_complete_length(data):
+    """Longitud de data sin la secuencia UTF-8 incompleta con la que pueda terminar"""
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte < 0x80:
+            return len(data)
+        if byte >= 0xC0:
+            # Byte inicial: la secuencia necesita 2, 3 o 4 bytes
+            needed = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+            return len(data) if back >= needed else len(data) - back
+    return len(data)
@@ -0,0 +1,117 @@
+"""
+WordPress Debug Viewer - Lectura hacia atrás del historial de debug.log
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import mmap
+import os
+
+from log_entry import split_entries
+
+
+class LogHistoryReader:
+    """Recorrer hacia atrás las entradas de un archivo de log proyectado en memoria"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.map = None
+        self.size = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """Proyectar en memoria el contenido actual del archivo"""
+        self.file = open(self.path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        # Un archivo vacío no se puede proyectar; no tiene historial
+        if self.size:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.size = len(self.map)
+
+    def close(self):
+        """Liberar la proyección (las páginas devueltas deben haberse liberado antes)"""
+        if self.map:
+            self.map.close()
+        self.map = None
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def is_entry_start(self, position):
+        """Comprobar si en position empieza una cabecera de entrada ("[...]" al inicio de línea)"""
+        mm = self.map
+        if position >= self.size or mm[position] != ord('['):
+            return False
+        if position and mm[position - 1] != ord('\n'):
+            return False
+        line_end = mm.find(b'\n', position)
+        return mm.find(b']', position + 1, self.size if line_end == -1 else line_end) != -1
+
+    def iter_entry_starts_backwards(self, end):
+        """Recorrer hacia atrás los inicios de entrada anteriores a end"""
+        if not self.map:
+            return
+        search_end = min(end, self.size)
+        while search_end > 0:
+            # La búsqueda la hace mmap en C, sin copiar el contenido
+            newline = self.map.rfind(b'\n[', 0, search_end)
+            start = newline + 1
+            if self.is_entry_start(start):
+                yield start
+            if newline == -1:
+                return
+            search_end = newline + 1
+
+    def find_entry_start_after(self, position, end):
+        """Buscar el primer inicio de entrada entre position y end (o None)"""
+        if not self.map:
+            return None
+        end = min(end, self.size)
+        if position == 0 and end > 0 and self.is_entry_start(0):
+            return 0
+        search_start = max(0, position - 1)
+        while True:
+            newline = self.map.find(b'\n[', search_start, end + 1)
+            if newline == -1 or newline + 1 >= end:
+                return None
+            if self.is_entry_start(newline + 1):
+                return newline + 1
+            search_start = newline + 1
+
+    def tail_start(self, end, max_bytes=0, max_entries=0):
+        """Calcular dónde empiezan las últimas entradas anteriores a end"""
+        end = min(end, self.size)
+        if max_entries:
+            # Las últimas max_entries entradas
+            for count, start in enumerate(self.iter_entry_starts_backwards(end), 1):
+                if count == max_entries:
+                    return start
+            return 0
+
+        if not max_bytes or end <= max_bytes:
+            return 0
+
+        # Los últimos max_bytes, alineados al siguiente inicio de entrada
+        start = self.find_entry_start_after(end - max_bytes, end)
+        if start is None:
+            # Una sola entrada ocupa todo el tramo: empezar en su cabecera
+            start = next(self.iter_entry_starts_backwards(end - max_bytes), 0)
+        return start
+
+    def read_entries_before(self, end, max_bytes=0, max_entries=0):
+        """Devolver (inicio, entradas) con la página de entradas anterior a end"""
+        start = self.tail_start(end, max_bytes, max_entries) if self.map and end > 0 else end
+        return start, self.read_entries(start, end)
+
+    def read_entries(self, start, end):
+        """Segmentar en entradas los bytes entre start y end, sin decodificarlos"""
+        if not self.map or start >= end:
+            return []
+        at_line_start = start == 0 or self.map[start - 1] == ord('\n')
+        return split_entries(self.map[start:min(end, self.size)], start, at_line_start)
@@ -0,0 +1,269 @@
+"""
+WordPress Debug Viewer - Índice persistente de entradas de debug.log
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import calendar
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from log_entry import TIMESTAMP_HEADER_SIZE, parse_timestamp
+from log_history import LogHistoryReader
+
+# Cabecera del archivo de índice: firma, versión, dispositivo, inodo, mtime (ns), tamaño del log,
+# bytes indexados, número de entradas y los últimos bytes indexados (para detectar reescrituras)
+INDEX_MAGIC = b'WPDI'
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('<4sHQQqQQQB64s')
+SIGNATURE_SIZE = 64
+# Segundos mínimos entre dos escrituras del índice en disco mientras el log crece
+INDEX_SAVE_INTERVAL = 30.0
+# Fechas ISO que se aceptan al saltar a una fecha (datetime.fromisoformat requiere Python 3.7)
+ISO_TIME_FORMATS = ('%Y-%m-%d', '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S')
+
+
+def parse_time_input(text):
+    """Interpretar una fecha escrita por el usuario (formato del log o ISO) como segundos UTC"""
+    text = text.strip()
+    if not text:
+        return None
+    timestamp = parse_timestamp(b'[' + text.encode('ascii', errors='ignore'))
+    if timestamp is not None:
+        return timestamp
+    for time_format in ISO_TIME_FORMATS:
+        try:
+            return float(calendar.timegm(time.strptime(text, time_format)))
+        except ValueError:
+            pass
+    return None
+
+
+class LogIndex:
+    """Posición en bytes y marca de tiempo de cada entrada de un log, guardadas junto a la configuración"""
+
+    # Solo un hilo llama a update(); lo indexado se publica de una vez bajo self.lock, que
+    # también toma quien hace varias consultas seguidas para verlas sobre el mismo índice
+
+    def __init__(self, log_path, cache_dir):
+        self.log_path = log_path
+        # Un archivo de índice por ruta de log
+        key = hashlib.sha1(os.path.abspath(log_path).encode('utf-8')).hexdigest()[:16]
+        self.index_path = os.path.join(cache_dir, f"{key}.idx") if cache_dir else None
+        self.lock = threading.Lock()
+        self.updated = threading.Condition(self.lock)  # Avisa cuando se publica lo indexado
+        self.stop_requested = threading.Event()  # Interrumpir la indexación (al cerrar el manejador)
+        self.ready = False  # El índice cubre el archivo al menos hasta la última actualización
+        self.dirty = False  # Hay entradas indexadas que aún no se guardaron en disco
+        self.saved_at = None  # Instante del último guardado
+        self.clear()
+
+    def clear(self):
+        """Descartar el índice en memoria"""
+        self.offsets = array('Q')  # Inicio en bytes de cada entrada
+        self.timestamps = array('d')  # Marca de tiempo de cada entrada (no decreciente)
+        self.file_id = None
+        self.mtime_ns = 0
+        self.size = 0  # Tamaño del log la última vez que se indexó
+        self.indexed_to = 0  # Bytes del log ya indexados (siempre al final de una línea completa)
+        self.signature = b""
+
+    def stop(self):
+        """Interrumpir la indexación en curso; lo ya indexado se conserva coherente"""
+        self.stop_requested.set()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def update(self):
+        """Cargar el índice guardado si sigue siendo válido y extenderlo con lo añadido al log"""
+        try:
+            stat = os.stat(self.log_path)
+        except OSError:
+            with self.lock:
+                self.clear()
+            return 0
+
+        if not self.offsets and not self.indexed_to:
+            self._load()
+
+        started = time.monotonic()
+        indexed_to = self.indexed_to
+        with LogHistoryReader(self.log_path) as reader:
+            if not self._is_valid(stat, reader):
+                with self.lock:
+                    self.clear()
+            self._extend(reader, stat)
+
+        if self.indexed_to != indexed_to:
+            print(f"Índice de {self.log_path}: {len(self.offsets)} entradas "
+                  f"({time.monotonic() - started:.2f} s)")
+            self.dirty = True
+        # Reescribir el archivo entero en cada lectura del log sería caro: se guarda como mucho
+        # cada INDEX_SAVE_INTERVAL segundos y lo pendiente, con flush() al terminar
+        if (self.dirty and not self.stop_requested.is_set() and
+                (self.saved_at is None or time.monotonic() - self.saved_at >= INDEX_SAVE_INTERVAL)):
+            self.flush()
+        self.ready = True
+        return len(self.offsets)
+
+    def flush(self):
+        """Guardar en disco lo indexado que aún no se guardó"""
+        if self.dirty:
+            self._save()
+            self.dirty = False
+            self.saved_at = time.monotonic()
+
+    def wait_until_indexed(self, position, timeout):
+        """Esperar a que el índice cubra el log hasta position; devolver False si no ocurre en timeout s"""
+        with self.updated:
+            return self.updated.wait_for(
+                lambda: self.indexed_to >= position or self.stop_requested.is_set(), timeout)
+
+    def entry_offset(self, number):
+        """Posición en bytes de la entrada número number (admite índices negativos)"""
+        return self.offsets[number]
+
+    def entries_before(self, position):
+        """Número de entradas que empiezan antes de position"""
+        return bisect_left(self.offsets, position)
+
+    def entry_at_time(self, timestamp):
+        """Número de la primera entrada con marca de tiempo igual o posterior a timestamp"""
+        return bisect_left(self.timestamps, timestamp)
+
+    def page_start(self, end, max_entries):
+        """Inicio de las últimas max_entries entradas anteriores a end"""
+        count = self.entries_before(end)
+        if count <= max_entries:
+            return 0
+        return self.offsets[count - max_entries]
+
+    def page_end(self, number, max_bytes=0, max_entries=0):
+        """Fin de la página que empieza en la entrada number (o None si llega al final del índice)"""
+        if max_entries:
+            last = number + max_entries
+        elif max_bytes:
+            last = max(number + 1, self.entries_before(self.offsets[number] + max_bytes))
+        else:
+            return None
+        return self.offsets[last] if last < len(self.offsets) else None
+
+    def _is_valid(self, stat, reader):
+        """Comprobar que el log es el mismo archivo y que lo indexado no ha cambiado"""
+        if not self.indexed_to:
+            return True
+        if stat.st_ino and self.file_id != (stat.st_dev, stat.st_ino):
+            return False
+        if reader.size < self.indexed_to:
+            return False
+        if reader.size == self.size and stat.st_mtime_ns != self.mtime_ns:
+            # Mismo tamaño pero modificado: se reescribió en lugar de crecer
+            return False
+        start = self.indexed_to - len(self.signature)
+        return reader.map[start:self.indexed_to] == self.signature
+
+    def _extend(self, reader, stat):
+        """Indexar las entradas añadidas desde la última actualización y publicarlas"""
+        offsets = array('Q')
+        timestamps = array('d')
+        end = self.indexed_to
+        if reader.map:
+            # Solo se indexan líneas completas: una cabecera a medio escribir se indexa después
+            end = self._scan(reader, reader.map.rfind(b'\n', self.indexed_to) + 1, offsets, timestamps)
+
+        # Las consultas ven el índice antes o después de esta actualización, nunca a medias
+        with self.updated:
+            self.offsets.extend(offsets)
+            self.timestamps.extend(timestamps)
+            if end != self.indexed_to:
+                self.indexed_to = end
+                self.signature = reader.map[max(0, end - SIGNATURE_SIZE):end]
+            self.file_id = (stat.st_dev, stat.st_ino)
+            self.mtime_ns = stat.st_mtime_ns
+            self.size = reader.size
+            self.updated.notify_all()
+
+    def _scan(self, reader, end, offsets, timestamps):
+        """Añadir a offsets y timestamps las entradas entre lo indexado y end; devolver dónde terminó"""
+        if end <= self.indexed_to:
+            return self.indexed_to
+        last_timestamp = self.timestamps[-1] if self.timestamps else 0.0
+        position = self.indexed_to
+        while True:
+            start = reader.find_entry_start_after(position, end)
+            if start is None:
+                break
+            if self.stop_requested.is_set():
+                # Terminar justo antes de esta entrada, que también es el final de una línea
+                end = start
+                break
+            timestamp = parse_timestamp(reader.map[start:start + TIMESTAMP_HEADER_SIZE])
+            # Las entradas sin fecha heredan la anterior para poder buscar por bisección
+            if timestamp is None or timestamp < last_timestamp:
+                timestamp = last_timestamp
+            offsets.append(start)
+            timestamps.append(timestamp)
+            last_timestamp = timestamp
+            position = start + 1
+        return end
+
+    def _load(self):
+        """Leer el índice guardado en disco"""
+        if not self.index_path or not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = f.read(INDEX_HEADER.size)
+                (magic, version, dev, inode, mtime_ns, size, indexed_to,
+                 count, signature_size, signature) = INDEX_HEADER.unpack(header)
+                if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                    return
+                offsets = array('Q')
+                timestamps = array('d')
+                offsets.fromfile(f, count)
+                timestamps.fromfile(f, count)
+        except (OSError, EOFError, struct.error) as e:
+            print(f"No se pudo leer el índice {self.index_path}: {e}")
+            return
+
+        with self.lock:
+            self.offsets = offsets
+            self.timestamps = timestamps
+            self.file_id = (dev, inode)
+            self.mtime_ns = mtime_ns
+            self.size = size
+            self.indexed_to = indexed_to
+            self.signature = signature[:signature_size]
+
+    def _save(self):
+        """Guardar el índice en disco de forma atómica"""
+        if not self.index_path:
+            return
+        dev, inode = self.file_id or (0, 0)
+        directory = os.path.dirname(self.index_path)
+        temp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # Un archivo temporal propio: dos manejadores pueden guardar el mismo índice a la vez
+            fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(self.index_path) + ".",
+                                             suffix=".tmp", dir=directory)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, dev, inode, self.mtime_ns,
+                                          self.size, self.indexed_to, len(self.offsets),
+                                          len(self.signature), self.signature))
+                self.offsets.tofile(f)
+                self.timestamps.tofile(f)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            print(f"No se pudo guardar el índice {self.index_path}: {e}")
+            if temp_path:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
@@ -0,0 +1,207 @@
+"""
+WordPress Debug Viewer - Lectura incremental del archivo debug.log
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import os
+import time
+
+from log_entry import split_entries, utf8_complete_length
+from log_history import LogHistoryReader
+
+# Cantidad de bytes ya leídos que se conservan para detectar reescrituras del archivo
+SIGNATURE_SIZE = 64
+# Segundos sin cambios en el archivo tras los que se muestra una última línea sin terminar
+PARTIAL_LINE_WAIT = 1.0
+
+# Constantes de CreateFileW para abrir el log en Windows sin bloquear su rotación
+GENERIC_READ = 0x80000000
+FILE_SHARE_READ = 0x1
+FILE_SHARE_WRITE = 0x2
+FILE_SHARE_DELETE = 0x4
+OPEN_EXISTING = 3
+FILE_ATTRIBUTE_NORMAL = 0x80
+
+
+def open_shared(path):
+    """Abrir un archivo para leer sin impedir que otros procesos lo renombren o lo borren"""
+    # En POSIX el descriptor sigue siendo válido después de renombrar el archivo. En Windows,
+    # open() no comparte el permiso de borrado y la rotación del log fallaría mientras el
+    # visor lo tiene abierto, así que se abre con FILE_SHARE_DELETE
+    if os.name != 'nt':
+        return open(path, 'rb')
+
+    import ctypes
+    import msvcrt
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.CreateFileW.argtypes = (ctypes.c_wchar_p, ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p,
+                                     ctypes.c_uint32, ctypes.c_uint32, ctypes.c_void_p)
+    kernel32.CreateFileW.restype = ctypes.c_void_p
+    handle = kernel32.CreateFileW(path, GENERIC_READ, FILE_SHARE_READ | FILE_SHARE_WRITE | FILE_SHARE_DELETE,
+                                  None, OPEN_EXISTING, FILE_ATTRIBUTE_NORMAL, None)
+    if handle is None or handle == ctypes.c_void_p(-1).value:
+        raise ctypes.WinError(ctypes.get_last_error())
+    return os.fdopen(msvcrt.open_osfhandle(handle, os.O_RDONLY), 'rb')
+
+
+class LogTailer:
+    """Leer únicamente los bytes añadidos al final de un archivo de log (UTF-8)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0  # Posición (en bytes) hasta la que ya se ha leído el archivo
+        # Archivo que se sigue; se mantiene abierto entre lecturas para poder terminar de
+        # leerlo aunque lo renombren (rotación)
+        self.file = None
+        self.file_id = None  # (dispositivo, inodo) del archivo que se sigue
+        self.signature = b""  # Últimos bytes leídos antes de self.offset
+        # (tamaño del archivo, instante) en que se retuvo una última línea sin terminar (o None)
+        self.held = None
+        self.rotations = 0
+        self.truncations = 0
+
+    def reset(self, offset=0):
+        """Reiniciar la lectura a partir de una posición concreta del archivo"""
+        self.offset = offset
+        self.signature = b""
+        self.held = None
+
+    def seek_to_tail(self, max_bytes=0, max_entries=0):
+        """Empezar a leer en el inicio de las últimas entradas del archivo; devuelve esa posición"""
+        self.close()
+        self.reset()
+        try:
+            self.file = open_shared(self.path)
+            # Los inicios de entrada se buscan hacia atrás sobre la proyección del archivo
+            with LogHistoryReader(self.path) as reader:
+                start = reader.tail_start(reader.size, max_bytes, max_entries)
+        except OSError:
+            self.close()
+            return 0
+        self.file_id = self._file_id(os.fstat(self.file.fileno()))
+        self.reset(start)
+        return start
+
+    def close(self):
+        """Cerrar y olvidar el archivo que se estaba siguiendo"""
+        if self.file:
+            self.file.close()
+        self.file = None
+        self.file_id = None
+
+    def read_entries(self, max_bytes=None):
+        """Leer los bytes añadidos desde la última lectura y devolverlos como entradas del log"""
+        if self.file and not self.file_id:
+            # Sin inodo no se puede saber si la ruta es ya otro archivo: se vuelve a abrir
+            # en cada lectura y solo se detectan los truncados
+            self.close()
+
+        if self.file and self._was_replaced():
+            # Rotación: antes de pasar al archivo nuevo se termina de leer el anterior, que
+            # sigue abierto, para no perder lo que se escribió en él tras la última lectura
+            entries = self._read_available(self.file, max_bytes, final=True)
+            if entries:
+                return entries
+            self.file.close()
+            self.file = None  # file_id se conserva para reconocer el archivo nuevo
+
+        if not self.file:
+            try:
+                self.file = open_shared(self.path)
+            except OSError:
+                return []
+            file_id = self._file_id(os.fstat(self.file.fileno()))
+            if self.file_id and file_id != self.file_id:
+                # El archivo fue renombrado o reemplazado: el nuevo se lee desde el principio
+                self.reset()
+                self.rotations += 1
+                print(f"Rotación detectada en {self.path}. Se continúa con el archivo nuevo")
+            self.file_id = file_id
+
+        size = os.fstat(self.file.fileno()).st_size
+        if self._was_truncated(self.file, size):
+            # El archivo se vació o se reescribió: volver al principio sin releer lo anterior
+            self.reset()
+            self.truncations += 1
+            print(f"Truncado detectado en {self.path}. Se reinicia la lectura desde el principio")
+
+        return self._read_available(self.file, max_bytes)
+
+    def _file_id(self, stat):
+        """Identificar un archivo por dispositivo e inodo"""
+        # Algunos sistemas de archivos no informan del inodo; en ese caso solo se
+        # puede detectar el truncado por tamaño
+        if not stat.st_ino:
+            return None
+        return (stat.st_dev, stat.st_ino)
+
+    def is_holding_line(self):
+        """Comprobar si la última lectura retuvo una línea sin terminar"""
+        return self.held is not None
+
+    def _was_replaced(self):
+        """Comprobar si la ruta ya no corresponde al archivo abierto (renombrado o borrado)"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return True
+        return self._file_id(stat) != self.file_id
+
+    def _was_truncated(self, file, size):
+        """Comprobar si el archivo encogió o si los últimos bytes leídos cambiaron"""
+        if size < self.offset:
+            return True
+        if not self.signature:
+            return False
+        file.seek(self.offset - len(self.signature))
+        return file.read(len(self.signature)) != self.signature
+
+    def _read_available(self, file, max_bytes=None, final=False):
+        """Leer lo disponible (hasta max_bytes) desde la posición actual y segmentarlo en entradas"""
+        # final indica que el archivo ya no va a crecer: se lee también su última línea sin terminar
+        file.seek(self.offset)
+        data = file.read() if max_bytes is None else file.read(max_bytes)
+        filled = max_bytes is not None and len(data) >= max_bytes
+        available = self.offset + len(data)
+        # Lo que quedó retenido se lee entero si el archivo lleva PARTIAL_LINE_WAIT segundos
+        # sin cambiar: error_log() sin salto de línea, o la última escritura de un proceso
+        # que terminó. Si después llega el resto, la vista lo une a la misma entrada
+        quiet = (self.held is not None and self.held[0] == available
+                 and time.monotonic() - self.held[1] >= PARTIAL_LINE_WAIT)
+        if not final and not quiet:
+            # No partir un carácter multibyte entre dos lecturas: sus bytes se leen la próxima vez
+            complete = utf8_complete_length(data)
+            if complete < len(data):
+                data = data[:complete]
+            # Tampoco partir una línea: PHP escribe cada una completa con su salto de línea, así
+            # que una línea sin terminar aún se está escribiendo. Leída a medias, su cabecera
+            # podría quedar cortada ("PHP Fat") y la entrada se clasificaría con un nivel
+            # equivocado. Solo se lee sin terminar si ocupa toda la lectura, para no quedarse
+            # atascado en ella
+            line_end = data.rfind(b'\n') + 1
+            if line_end or not filled:
+                data = data[:line_end]
+
+        if self.offset + len(data) < available and not filled:
+            # Se retuvo el final del archivo: recordar desde cuándo está así
+            if self.held is None or self.held[0] != available:
+                self.held = (available, time.monotonic())
+        else:
+            self.held = None
+        if not data:
+            return []
+
+        # Una lectura que no empieza tras un salto de línea continúa la entrada anterior
+        at_line_start = not self.signature or self.signature.endswith(b'\n')
+        entries = split_entries(data, self.offset, at_line_start)
+        if final and not data.endswith(b'\n') and self.offset + len(data) >= os.fstat(file.fileno()).st_size:
+            # El archivo ya no crece: su última línea se cierra para que no se una a lo siguiente
+            entries[-1].text = entries[-1].text + '\n'
+
+        # Avanzar la posición solo con lo que realmente se ha leído
+        self.offset += len(data)
+        if len(data) >= SIGNATURE_SIZE:
+            self.signature = data[-SIGNATURE_SIZE:]
+        else:
+            self.signature = (self.signature + data)[-SIGNATURE_SIZE:]
+        return entries
@@ -3,9 +3,10 @@ WordPress Debug Viewer - Módulo principal (versión moderna)
 Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
 """
 
+import multiprocessing
 import os
-import time
 import sys
+import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import re
@@ -16,84 +17,166 @@ if current_dir not in sys.path:
     sys.path.append(current_dir)
 
 # Importar módulos locales
-from config import Config
+from config import Config, DEFAULT_REFRESH_INTERVAL, DEFAULT_OPEN_TAIL_KB, DEFAULT_OPEN_TAIL_ENTRIES
 from gui_modern import DebuggerGUI
+from log_entry import LogEntry
+from log_history import LogHistoryReader
+from log_index import LogIndex, parse_time_input
+from log_tail import LogTailer, PARTIAL_LINE_WAIT
+from scheduler import CoalescingScheduler
+
+# Tamaño máximo de cada lectura del debug.log para acotar el trabajo por iteración
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+# Segundos que un salto a una fecha espera a que el índice cubra lo ya leído
+INDEX_WAIT_TIMEOUT = 1.0
+# Tamaño aproximado de cada página al volver a filtrar lo mostrado (alineada a inicios de entrada)
+REFILTER_PAGE_SIZE = 1024 * 1024
 
 class DebugLogHandler(FileSystemEventHandler):
     def __init__(self, debug_log_path, gui, config):
         self.debug_log_path = debug_log_path
         self.gui = gui
         self.config = config
-        self.last_modified = 0
-        self.last_content = ""
-
-        # Expresión regular para detectar bloques (líneas que comienzan con corchetes)
-        self.block_pattern = re.compile(r'^\[.*?\]', re.MULTILINE)
-
-        # Mostrar contenido inicial si existe
+        # Lector incremental: solo se leen los bytes añadidos desde la última lectura
+        self.tailer = LogTailer(debug_log_path)
+        # Evita que el planificador y los botones de la GUI lean el archivo a la vez
+        self.lock = threading.RLock()
+
+        # En archivos grandes solo se muestran al abrir las últimas entradas;
+        # las anteriores se cargan bajo demanda por páginas del mismo tamaño
+        self.tail_bytes = int(getattr(config, 'open_tail_kb', DEFAULT_OPEN_TAIL_KB)) * 1024
+        self.tail_entries = int(getattr(config, 'open_tail_entries', DEFAULT_OPEN_TAIL_ENTRIES))
+        self.history_start = 0  # Posición del archivo donde empieza lo mostrado
+        self.view_gap = None  # (inicio, fin) de los bytes no mostrados tras saltar a una fecha
+        # Cada cambio de filtros, recarga o truncado invalida los filtrados en segundo plano anteriores
+        self.refilter_generation = 0
+        self.refilter_active = None  # Generación del filtrado en segundo plano en curso (o None)
+        # Índice persistente de entradas para paginar y saltar a una fecha sin recorrer el archivo
+        self.index = LogIndex(debug_log_path, getattr(config, 'cache_dir', None))
+
+        # Agrupar ráfagas de eventos en lecturas espaciadas, con una lectura final garantizada.
+        # Se crea antes de la primera lectura, que puede programar otra
+        refresh_interval = getattr(config, 'refresh_interval', DEFAULT_REFRESH_INTERVAL)
+        self.scheduler = CoalescingScheduler(self.show_current_content, refresh_interval)
+
+        # Mostrar contenido inicial si existe, partiendo de una vista vacía
         if os.path.exists(debug_log_path):
-            self.show_current_content()
+            self.reload_content()
+
+        # Construir o extender el índice en segundo plano para no retrasar la apertura; el lector
+        # lo vuelve a pedir cada vez que avanza
+        self.index_requested = threading.Event()
+        self.index_thread = threading.Thread(target=self.update_index)
+        self.index_thread.daemon = True
+        self.index_thread.start()
 
     def on_modified(self, event):
         if event.src_path == self.debug_log_path:
-            # Evitar múltiples actualizaciones en un corto período
-            current_time = time.time()
-            if current_time - self.last_modified > 0.5:  # 500ms debounce
-                self.last_modified = current_time
-                self.show_current_content()
-
-    def show_current_content(self):
-        """Mostrar el contenido actual del archivo debug.log"""
-        try:
-            # Verificar si el archivo existe
-            if not os.path.exists(self.debug_log_path):
-                print(f"El archivo {self.debug_log_path} no existe")
-                return
-
-            # Verificar si el archivo está vacío
-            if os.path.getsize(self.debug_log_path) == 0:
-                print(f"El archivo {self.debug_log_path} está vacío")
-                self.gui.update_content("")
-                return
+            self.scheduler.trigger()
 
-            with open(self.debug_log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-
-                # Verificar si hay cambios en el contenido
-                if content != self.last_content:
-                    print(f"Cambios detectados. Tamaño anterior: {len(self.last_content)}, Tamaño actual: {len(content)}")
-                    self.last_content = content
-
-                    # Aplicar filtrado de expresiones regulares
-                    filtered_content = self.filter_content(content)
+    def on_created(self, event):
+        # El archivo se volvió a crear (por ejemplo, después de una rotación)
+        if event.src_path == self.debug_log_path:
+            self.scheduler.trigger()
 
-                    # Enviar el contenido a la GUI
-                    self.gui.update_content(filtered_content)
+    def on_moved(self, event):
+        # El archivo fue renombrado (rotación) o reemplazado por otro
+        if event.src_path == self.debug_log_path or event.dest_path == self.debug_log_path:
+            self.scheduler.trigger()
 
-                    # Hacer que el título parpadee
-                    self.gui.flash_title()
-                else:
-                    print("No se detectaron cambios en el contenido")
+    def show_current_content(self):
+        """Mostrar el contenido añadido al archivo debug.log desde la última lectura"""
+        # El cerrojo solo se toma para leer y actualizar posiciones: el filtrado, que puede
+        # agotar el límite de tiempo de una excepción, no bloquea las acciones de la interfaz.
+        # Solo el hilo del planificador llama aquí, así que los fragmentos llegan en orden
+        try:
+            changed = False
+
+            # Leer únicamente los bytes nuevos, en bloques de tamaño acotado
+            while True:
+                with self.lock:
+                    truncations = self.tailer.truncations
+                    rotations = self.tailer.rotations
+                    new_entries = self.tailer.read_entries(READ_CHUNK_SIZE)
+
+                    if self.tailer.rotations != rotations:
+                        # El archivo nuevo se lee desde el principio: no hay historial anterior
+                        self.history_start = 0
+                        self.view_gap = None
+                        self.refilter_generation += 1
+
+                    truncated = self.tailer.truncations != truncations
+                    if truncated:
+                        # El archivo se truncó: la vista se repinta solo con el contenido nuevo
+                        self.history_start = 0
+                        self.view_gap = None
+                        self.refilter_generation += 1
+                    elif not new_entries:
+                        break
+                    elif self.refilter_active == self.refilter_generation:
+                        # Un filtrado en segundo plano está enviando la vista por páginas: estos
+                        # bytes los añade él al terminar, para que no se adelanten a sus páginas
+                        changed = True
+                        continue
+                    generation = self.refilter_generation
+
+                changed = True
+                if new_entries:
+                    new_bytes = sum(entry.length for entry in new_entries)
+                    print(f"Cambios detectados. Bytes nuevos: {new_bytes}, Posición actual: {self.tailer.offset}")
+
+                # Aplicar filtrado de expresiones regulares
+                filtered_entries = self.filter_entries(new_entries)
+
+                with self.lock:
+                    # Una recarga, un salto a una fecha o un nuevo filtrado ya cubren estos bytes
+                    if generation != self.refilter_generation:
+                        continue
+                    if truncated:
+                        self.gui.enqueue_content(filtered_entries)
+                    else:
+                        # Enviar solo las entradas nuevas a la GUI
+                        self.gui.enqueue_append(filtered_entries)
+
+            if changed:
+                # Hacer que el título parpadee
+                self.gui.enqueue_flash_title()
+                self.index_requested.set()
+            else:
+                print("No se detectaron cambios en el contenido")
+
+            if self.tailer.is_holding_line():
+                # Volver a leer cuando el archivo lleve un rato sin cambiar, para mostrar
+                # también la última línea aunque nunca llegue a terminarse
+                self.scheduler.trigger_after(PARTIAL_LINE_WAIT)
         except Exception as e:
             print(f"Error al leer el archivo: {e}")
 
-    def filter_content(self, content):
-        """Filtrar el contenido usando las expresiones regulares configuradas"""
-        if not self.config or not self.config.regex_exceptions:
-            return content
-
-        filtered_content = content
-        for regex_pattern in self.config.regex_exceptions:
-            try:
-                # Crear un patrón de regex
-                pattern = re.compile(regex_pattern, re.MULTILINE)
-
-                # Reemplazar las coincidencias con un mensaje de filtrado
-                filtered_content = pattern.sub("[FILTRADO: Coincide con patrón configurado]", filtered_content)
-            except Exception as e:
-                print(f"Error al aplicar filtro regex '{regex_pattern}': {e}")
-
-        return filtered_content
+    def filter_entries(self, entries):
+        """Filtrar el texto de las entradas usando las expresiones regulares configuradas"""
+        if not entries or not self.config or not self.config.regex_exceptions:
+            return entries
+
+        # Todas las excepciones se aplican en una sola pasada, en un proceso aparte con límite de
+        # tiempo: una expresión con retroceso catastrófico se pone en cuarentena en lugar de bloquear
+        filtered, quarantined = self.config.apply_regex_exceptions(
+            [entry.text for entry in entries], "[FILTRADO: Coincide con patrón configurado]", re.MULTILINE)
+        if quarantined:
+            self.report_quarantine(quarantined)
+
+        # Cada entrada conserva su posición en el archivo; las que quedan vacías se descartan
+        result = []
+        for entry, text in zip(entries, filtered):
+            if text != entry.text:
+                entry.text = text
+            if text:
+                result.append(entry)
+        return result
+
+    def report_quarantine(self, patterns):
+        """Avisar en la interfaz de las excepciones desactivadas por lentas"""
+        self.gui.enqueue_status(f"Excepción desactivada por lenta: {', '.join(patterns)}")
+        self.gui.enqueue_exceptions_changed()
 
     def clear_content(self):
         """Borrar el contenido del archivo debug.log"""
@@ -103,22 +186,227 @@ class DebugLogHandler(FileSystemEventHandler):
                 print(f"El archivo {self.debug_log_path} no existe")
                 return
 
-            # Abrir el archivo en modo escritura para borrarlo
-            with open(self.debug_log_path, 'w', encoding='utf-8') as f:
-                f.write("")
+            with self.lock:
+                # Abrir el archivo en modo escritura para borrarlo
+                with open(self.debug_log_path, 'w', encoding='utf-8') as f:
+                    f.write("")
 
-            # Actualizar el contenido en la GUI
-            self.last_content = ""
-            self.gui.update_content("")
+                # Actualizar el contenido en la GUI
+                self.tailer.reset()
+                self.history_start = 0
+                self.view_gap = None
+                self.refilter_generation += 1
+                self.gui.enqueue_content([])
             print(f"Contenido de {self.debug_log_path} borrado")
         except Exception as e:
             print(f"Error al borrar el contenido: {e}")
 
     def reload_content(self):
         """Recargar el contenido del archivo debug.log"""
-        # Forzar la recarga del contenido
-        self.last_content = ""
-        self.show_current_content()
+        # Forzar la recarga de las últimas entradas del archivo
+        with self.lock:
+            self.history_start = self.tailer.seek_to_tail(self.tail_bytes, self.tail_entries)
+            self.view_gap = None
+            self.refilter_generation += 1
+            self.gui.enqueue_content([])
+            if self.history_start:
+                print(f"Se omiten los primeros {self.history_start} bytes; use 'Cargar anteriores' para verlos")
+        # La lectura la hace el hilo del planificador, sin detener la interfaz
+        self.scheduler.trigger()
+
+    def load_history(self):
+        """Cargar la página de entradas anterior a lo que ya se muestra"""
+        with self.lock:
+            if not self.history_start:
+                print("No hay entradas anteriores que cargar")
+                return
+
+            try:
+                with LogHistoryReader(self.debug_log_path) as reader:
+                    if self.tail_entries and self.index.ready:
+                        # Con el índice, la página se localiza por bisección
+                        with self.index.lock:
+                            start = self.index.page_start(self.history_start, self.tail_entries)
+                        entries = reader.read_entries(start, self.history_start)
+                    else:
+                        start, entries = reader.read_entries_before(self.history_start, self.tail_bytes, self.tail_entries)
+            except Exception as e:
+                print(f"Error al cargar el historial: {e}")
+                return
+
+            print(f"Cargando historial: bytes {start} a {self.history_start}")
+            self.history_start = start
+
+            # Enviar las entradas anteriores filtradas al principio de la vista
+            self.gui.enqueue_prepend(self.filter_entries(entries))
+
+    def update_index(self):
+        """Cargar, validar y extender el índice de entradas del archivo cada vez que se pide"""
+        while not self.index.stop_requested.is_set():
+            self.index_requested.clear()
+            try:
+                self.index.update()
+            except Exception as e:
+                print(f"Error al actualizar el índice: {e}")
+            self.index_requested.wait()
+        try:
+            self.index.flush()
+        except Exception as e:
+            print(f"Error al guardar el índice: {e}")
+
+    def jump_to_time(self, text):
+        """Mostrar las entradas a partir de una fecha; devuelve False si no es posible"""
+        timestamp = parse_time_input(text)
+        if timestamp is None:
+            print(f"Fecha no reconocida: {text}")
+            return False
+        if not self.index.ready:
+            print("El índice del archivo aún se está construyendo")
+            return False
+
+        # El índice se pone al día en su hilo: se espera un momento a que cubra lo ya leído
+        self.index_requested.set()
+        self.index.wait_until_indexed(self.tailer.offset, INDEX_WAIT_TIMEOUT)
+
+        with self.lock:
+            try:
+                with self.index.lock:
+                    count = len(self.index)
+                    number = self.index.entry_at_time(timestamp)
+                    if number >= count or self.index.entry_offset(number) >= self.tailer.offset:
+                        print("No hay entradas mostradas a partir de esa fecha")
+                        return False
+
+                    start = self.index.entry_offset(number)
+                    end = self.index.page_end(number, self.tail_bytes, self.tail_entries)
+                if end is None or end > self.tailer.offset:
+                    end = self.tailer.offset
+                with LogHistoryReader(self.debug_log_path) as reader:
+                    entries = self.filter_entries(reader.read_entries(start, end))
+            except Exception as e:
+                print(f"Error al saltar a la fecha: {e}")
+                return False
+
+            # Lo que queda entre la página y el contenido más reciente no se muestra
+            self.view_gap = None
+            if end < self.tailer.offset:
+                self.view_gap = (end, self.tailer.offset)
+                entries.append(self.gap_notice(*self.view_gap))
+
+            print(f"Mostrando desde la entrada {number + 1} de {count} (byte {start})")
+            self.history_start = start
+            self.refilter_generation += 1
+            self.gui.enqueue_content(entries)
+            return True
+
+    def gap_notice(self, start, end):
+        """Entrada de aviso que ocupa en la vista el lugar de los bytes no mostrados"""
+        return LogEntry(text=f"\n[... {end - start} bytes omitidos hasta el contenido más reciente; "
+                             f"consulte el archivo debug.log ...]\n")
+
+    def refilter_content(self):
+        """Volver a filtrar en segundo plano lo mostrado, tras cambiar las excepciones"""
+        with self.lock:
+            self.refilter_generation += 1
+            generation = self.refilter_generation
+            self.refilter_active = generation
+            end = self.tailer.offset
+
+            # Lo que la vista ya descartó por el límite de retención no se vuelve a leer
+            trimmed_to = self.gui.retained_start()
+            if trimmed_to is not None and trimmed_to > self.history_start:
+                self.history_start = trimmed_to
+                if self.view_gap and trimmed_to >= self.view_gap[0]:
+                    # Lo anterior al hueco de un salto a una fecha ya no está en la vista
+                    self.history_start = max(trimmed_to, self.view_gap[1])
+                    self.view_gap = None
+
+            # Tramos del archivo que forman la vista (sin el hueco de un salto a una fecha)
+            if self.view_gap:
+                ranges = [(self.history_start, self.view_gap[0]), (self.view_gap[1], end)]
+            else:
+                ranges = [(self.history_start, end)]
+
+        worker = threading.Thread(target=self._refilter_worker, args=(generation, ranges))
+        worker.daemon = True
+        worker.start()
+
+    def _refilter_worker(self, generation, ranges):
+        """Filtrar de nuevo los tramos indicados por páginas y enviar cada una a la vista"""
+        total = sum(end - start for start, end in ranges) or 1
+        done = 0
+        replaced = False  # La primera página sustituye a la vista; las demás se añaden al final
+        try:
+            with LogHistoryReader(self.debug_log_path) as reader:
+                for number, (start, end) in enumerate(ranges):
+                    position = start
+                    while position < end:
+                        # Un cambio de filtros posterior deja obsoleto este trabajo
+                        if generation != self.refilter_generation:
+                            return
+                        page_end = end
+                        if position + REFILTER_PAGE_SIZE < end:
+                            page_end = reader.find_entry_start_after(position + REFILTER_PAGE_SIZE, end) or end
+                        entries = self.filter_entries(reader.read_entries(position, page_end))
+                        if number and position == start:
+                            entries.insert(0, self.gap_notice(ranges[number - 1][1], start))
+                        with self.lock:
+                            if generation != self.refilter_generation:
+                                return
+                            # Cada página se envía en cuanto está filtrada: la memoria no crece con
+                            # el tamaño de lo mostrado y la vista aplica su límite de retención
+                            if replaced:
+                                self.gui.enqueue_append(entries)
+                            else:
+                                self.gui.enqueue_content(entries)
+                                replaced = True
+                        done += page_end - position
+                        position = page_end
+                        self.gui.enqueue_status(f"Aplicando filtros... {done * 100 // total}%")
+
+            # Incluir lo que el lector haya leído mientras tanto, que no envió a la vista. Se filtra
+            # fuera del cerrojo y se repite hasta alcanzarlo; entonces el lector vuelve a enviar
+            end = ranges[-1][1]
+            while True:
+                with self.lock:
+                    if generation != self.refilter_generation:
+                        return
+                    offset = self.tailer.offset
+                    if offset <= end:
+                        if not replaced:
+                            self.gui.enqueue_content([])
+                        self.refilter_active = None
+                        break
+                with LogHistoryReader(self.debug_log_path) as reader:
+                    entries = self.filter_entries(reader.read_entries(end, offset))
+                with self.lock:
+                    if generation != self.refilter_generation:
+                        return
+                    if replaced:
+                        self.gui.enqueue_append(entries)
+                    else:
+                        self.gui.enqueue_content(entries)
+                        replaced = True
+                end = offset
+            print(f"Filtros aplicados de nuevo a {total} bytes")
+        except Exception as e:
+            print(f"Error al volver a aplicar los filtros: {e}")
+        finally:
+            # Si empezó otro filtrado, será ese el que actualice el estado
+            if self.refilter_active in (generation, None):
+                self.refilter_active = None
+                self.gui.enqueue_status("")
+
+    def close(self):
+        """Detener el planificador y la indexación y olvidar el archivo debug.log que se está siguiendo"""
+        self.scheduler.stop()
+        # La indexación se interrumpe en la siguiente entrada; se espera para que no
+        # siga escribiendo el índice cuando ya hay otro manejador
+        self.index.stop()
+        self.index_requested.set()
+        self.index_thread.join()
+        with self.lock:
+            self.tailer.close()
 
 def main():
     # Cargar configuración
@@ -143,11 +431,27 @@ def main():
             print("Recargando contenido del archivo debug.log...")
             debug_handler.reload_content()
 
+    def on_load_history():
+        if debug_handler:
+            debug_handler.load_history()
+
+    def on_refilter_content():
+        if debug_handler:
+            debug_handler.refilter_content()
+
+    def on_jump_to_time(text):
+        if debug_handler:
+            return debug_handler.jump_to_time(text)
+        return False
+
     # Inicializar GUI con las funciones de callback
     gui = DebuggerGUI(on_path_selected, on_clear_content, config)
 
-    # Añadir la función de recarga
+    # Añadir las funciones de recarga y de carga del historial
     gui.on_reload_content = on_reload_content
+    gui.on_load_history = on_load_history
+    gui.on_jump_to_time = on_jump_to_time
+    gui.on_refilter_content = on_refilter_content
 
     def start_monitoring(wp_content_path):
         nonlocal debug_handler, observer
@@ -173,15 +477,18 @@ def main():
                 print(f"Error al crear el archivo debug.log: {e}")
                 return False
 
-        # Inicializar el manejador de eventos
-        debug_handler = DebugLogHandler(debug_log_path, gui, config)
-
-        # Configurar y iniciar el observador
+        # Detener el observador y el manejador anteriores
         if observer:
             observer.stop()
             if observer.is_alive():
                 observer.join()
+        if debug_handler:
+            debug_handler.close()
 
+        # Inicializar el manejador de eventos
+        debug_handler = DebugLogHandler(debug_log_path, gui, config)
+
+        # Configurar y iniciar el observador
         observer = Observer()
         observer.schedule(debug_handler, debug_dir, recursive=False)
         observer.start()
@@ -214,7 +521,12 @@ def main():
             observer.stop()
             if observer.is_alive():
                 observer.join()
+        if debug_handler:
+            debug_handler.close()
+        config.regex_guard.close()
         print("Programa finalizado")
 
 if __name__ == "__main__":
+    # Necesario para el proceso de filtrado en los ejecutables de PyInstaller
+    multiprocessing.freeze_support()
     main()
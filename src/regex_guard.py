@@ -0,0 +1,247 @@
+"""
+WordPress Debug Viewer - Límite de tiempo para las expresiones regulares de excepción
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import multiprocessing
+import re
+import threading
+
+from filter_engine import FilterEngine, merge_stats
+
+# Segundos que puede tardar el filtrado de cada BUDGET_CHARS caracteres antes de buscar la expresión culpable
+DEFAULT_TIME_BUDGET = 2.0
+# Caracteres que cubre el límite de tiempo: los fragmentos mayores tienen un límite proporcional
+BUDGET_CHARS = 256 * 1024
+# Segundos de espera para que arranque el proceso auxiliar (no cuentan para el límite)
+STARTUP_TIMEOUT = 30.0
+# Motores compilados que conserva cada proceso antes de descartarlos
+MAX_CACHED_ENGINES = 16
+
+# Texto de prueba para las expresiones nuevas: repeticiones largas de un mismo carácter
+# terminadas en otro distinto, que disparan el retroceso exponencial de los patrones
+# mal escritos como (a+)+$ o (\s*)*x, más unas cuantas entradas típicas del log
+PROBE_LENGTH = 4096
+PROBE_CONTENT = "\n".join(
+    [char * PROBE_LENGTH + end for char, end in (('a', '!'), (' ', '!'), ('1', 'x'), ('.', '!'), ('[', '!'))]
+    + ["[17-Oct-2026 10:11:12 UTC] PHP Warning:  Undefined variable $value in "
+       "/var/www/html/wp-content/plugins/plugin/plugin.php on line 10"] * 200
+)
+
+# Marca interna de "tiempo agotado"
+TIMEOUT = object()
+
+
+def content_size(content):
+    """Caracteres de un texto o de la lista con el texto de cada entrada"""
+    if isinstance(content, list):
+        return sum(len(text) for text in content)
+    return len(content)
+
+
+def get_engine(engines, patterns, flags):
+    """Devolver el motor de filtrado de patterns desde la caché engines"""
+    key = (patterns, flags)
+    engine = engines.get(key)
+    if engine is None:
+        if len(engines) >= MAX_CACHED_ENGINES:
+            engines.clear()
+        engine = FilterEngine(patterns, flags)
+        engines[key] = engine
+    return engine
+
+
+def apply_engine(engine, content, replacement):
+    """Filtrar un texto o, si content es una lista, el texto de cada entrada"""
+    if isinstance(content, list):
+        return engine.sub_entries(content, replacement)
+    return engine.sub(content, replacement)
+
+
+def match_spans(compiled, texts):
+    """Tramos (posición, longitud) de las coincidencias no vacías de compiled en cada texto"""
+    return [[(match.start(), match.end() - match.start())
+             for match in compiled.finditer(text) if match.end() > match.start()]
+            for text in texts]
+
+
+def handle_request(engines, patterns, flags, content, replacement):
+    """Filtrar content con patterns o, si replacement es None, buscar el único patrón en cada texto"""
+    if replacement is None:
+        return match_spans(re.compile(patterns[0], flags), content)
+    engine = get_engine(engines, patterns, flags)
+    return apply_engine(engine, content, replacement), engine.take_stats()
+
+
+def serve_filters(connection):
+    """Bucle del proceso auxiliar: aplicar las excepciones recibidas y devolver el resultado"""
+    engines = {}
+    connection.send("ready")
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        try:
+            result = handle_request(engines, *request)
+        except Exception as e:
+            result = e
+        connection.send(result)
+
+
+class RegexGuard:
+    """Aplicar las excepciones en un proceso auxiliar que se detiene si supera el límite de tiempo"""
+
+    def __init__(self, time_budget=DEFAULT_TIME_BUDGET):
+        self.time_budget = time_budget
+        # El módulo re no suelta el GIL mientras busca: un hilo vigilante no podría ni
+        # ejecutarse, así que la expresión se evalúa en otro proceso que se puede detener
+        self.context = multiprocessing.get_context('spawn')
+        self.process = None
+        self.connection = None
+        self.available = True  # False si no se pudo iniciar el proceso auxiliar
+        self.engines = {}  # Motores para filtrar sin proceso auxiliar
+        # Cifras acumuladas por patrón: (coincidencias, bytes suprimidos, segundos de evaluación).
+        # Se sustituye el diccionario en cada cambio, así la interfaz lo lee sin esperar al filtrado
+        self.stats = {}
+        self.stats_lock = threading.Lock()  # Solo para quienes modifican self.stats
+        self.lock = threading.Lock()  # Uso del proceso auxiliar
+
+    def sub(self, patterns, flags, content, replacement):
+        """Devolver (contenido filtrado, patrones que superaron por sí solos el límite de tiempo con este contenido)"""
+        # content puede ser un texto o una lista con el texto de cada entrada
+        patterns = tuple(patterns)
+        if not patterns or not content:
+            return content, []
+
+        # Un fragmento grande tarda más aun con expresiones sanas: el límite crece con su tamaño
+        budget = self.time_budget * max(1, content_size(content) / BUDGET_CHARS)
+        with self.lock:
+            result = self._run(patterns, flags, content, replacement, budget)
+            if result is not TIMEOUT:
+                return self._record(result), []
+
+            # Se busca la culpable con el mismo fragmento que se atascó: cada expresión se aplica
+            # sola, con el mismo límite, sobre el resultado de las anteriores. La que lo supera
+            # se pone en cuarentena y las demás filtran el fragmento igualmente
+            print(f"El filtrado superó el límite de {budget:.1f} s; buscando la expresión culpable")
+            slow = []
+            for pattern in patterns:
+                filtered = self._run((pattern,), flags, content, replacement, budget)
+                if filtered is TIMEOUT:
+                    slow.append(pattern)
+                else:
+                    content = self._record(filtered)
+
+            # El tiempo perdido con los patrones lentos cuenta en su coste
+            self._merge_stats({pattern: (0, 0, budget) for pattern in slow})
+            return content, slow
+
+    def find(self, pattern, flags, texts):
+        """Devolver los tramos de las coincidencias de pattern en cada texto, o TIMEOUT si se atasca"""
+        # Para buscar con expresiones escritas por el usuario: el límite crece con el tamaño
+        texts = list(texts)
+        if not texts:
+            return []
+        budget = self.time_budget * max(1, content_size(texts) / BUDGET_CHARS)
+        with self.lock:
+            return self._run((pattern,), flags, texts, None, budget)
+
+    def get_stats(self, pattern):
+        """Devolver (coincidencias, bytes suprimidos, segundos de evaluación) acumulados de un patrón"""
+        return self.stats.get(pattern, (0, 0, 0.0))
+
+    def reset_stats(self, pattern=None):
+        """Poner a cero las cifras de un patrón (o de todos)"""
+        with self.stats_lock:
+            if pattern is None:
+                self.stats = {}
+            else:
+                stats = dict(self.stats)
+                stats.pop(pattern, None)
+                self.stats = stats
+
+    def is_fast(self, pattern, flags=0):
+        """Comprobar que un patrón no supera el límite de tiempo con el texto de prueba"""
+        # Puede esperar al filtrado en curso y arrancar el proceso auxiliar: no llamar desde la interfaz
+        with self.lock:
+            return self._run((pattern,), flags, PROBE_CONTENT, "", self.time_budget) is not TIMEOUT
+
+    def close(self):
+        """Detener el proceso auxiliar"""
+        with self.lock:
+            self._stop()
+
+    def _record(self, result):
+        """Acumular las cifras de una pasada y devolver el contenido filtrado"""
+        content, stats = result
+        self._merge_stats(stats)
+        return content
+
+    def _merge_stats(self, stats):
+        """Sumar cifras por patrón en una copia de self.stats y publicarla"""
+        with self.stats_lock:
+            merged = dict(self.stats)
+            merge_stats(merged, stats)
+            self.stats = merged
+
+    def _run(self, patterns, flags, content, replacement, timeout):
+        """Atender una petición en el proceso auxiliar; devolver su resultado o TIMEOUT si no termina a tiempo"""
+        if not self._start():
+            return handle_request(self.engines, patterns, flags, content, replacement)
+
+        try:
+            self.connection.send((patterns, flags, content, replacement))
+            if self.connection.poll(timeout):
+                result = self.connection.recv()
+                if isinstance(result, Exception):
+                    raise result
+                return result
+        except (OSError, EOFError) as e:
+            # El proceso auxiliar murió con estas expresiones (por ejemplo, sin memoria):
+            # se trata como un tiempo agotado y se reiniciará en la próxima llamada
+            print(f"Error en el proceso de filtrado: {e}")
+
+        # Tiempo agotado: el proceso sigue atascado en la expresión y se detiene
+        self._stop()
+        return TIMEOUT
+
+    def _start(self):
+        """Iniciar el proceso auxiliar si no está en marcha"""
+        if self.process is not None and self.process.is_alive():
+            return True
+        self._stop()
+        if not self.available:
+            return False
+
+        process = None
+        try:
+            connection, child_connection = self.context.Pipe()
+            process = self.context.Process(target=serve_filters, args=(child_connection,), daemon=True)
+            process.start()
+            child_connection.close()
+            if not connection.poll(STARTUP_TIMEOUT) or connection.recv() != "ready":
+                raise OSError("el proceso auxiliar no respondió")
+        except Exception as e:
+            print(f"No se pudo iniciar el proceso de filtrado; se filtra sin límite de tiempo: {e}")
+            if process is not None and process.is_alive():
+                process.terminate()
+            self.available = False
+            return False
+
+        self.process = process
+        self.connection = connection
+        return True
+
+    def _stop(self):
+        """Detener el proceso auxiliar y cerrar la conexión"""
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join(1)
+        if self.connection is not None:
+            self.connection.close()
+        self.process = None
+        self.connection = None
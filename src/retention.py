@@ -0,0 +1,157 @@
+"""
+WordPress Debug Viewer - Retención acotada del contenido mostrado
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+from collections import deque
+
+from duplicates import DuplicateFolder
+from log_entry import LEVEL_ORDER, as_entries, entries_from_text, join_entries
+
+# Al recortar se deja el contenido en esta fracción del límite para no recortar en cada actualización
+TRIM_TARGET = 0.9
+
+
+class RetentionBuffer:
+    """Conservar solo las últimas entradas mostradas, hasta N entradas o N caracteres"""
+
+    def __init__(self, max_entries=0, max_chars=0, fold_duplicates=False):
+        self.max_entries = max_entries  # 0 = sin límite
+        self.max_chars = max_chars  # 0 = sin límite
+        self.entries = deque()  # LogEntry retenidas, en orden
+        self.chars = 0
+        # Posición en el archivo hasta la que se descartaron entradas por el límite (o None)
+        self.trimmed_to = None
+        # Entradas guardadas al final y al principio, y entradas finales sustituidas al volver
+        # a analizarlas, desde el último clear(): la vista las usa para ponerse al día sin
+        # recorrer todas las entradas
+        self.appended_entries = 0
+        self.prepended_entries = 0
+        self.replaced_entries = 0
+        # Entrada que contiene la línea que el último append() volvió a analizar (o None)
+        self.rejoined = None
+        self.level_counts = dict.fromkeys(LEVEL_ORDER, 0)  # Entradas retenidas de cada nivel
+        # Las repeticiones de un mensaje se cuentan en la entrada que lo mostró primero
+        # en lugar de retenerse, así que la memoria crece con los errores distintos
+        self.folder = DuplicateFolder() if fold_duplicates else None
+
+    def clear(self):
+        """Vaciar el buffer"""
+        self.entries.clear()
+        self.chars = 0
+        self.trimmed_to = None
+        self.appended_entries = 0
+        self.prepended_entries = 0
+        self.replaced_entries = 0
+        self.level_counts = dict.fromkeys(LEVEL_ORDER, 0)
+        if self.folder:
+            self.folder.clear()
+
+    def get_text(self):
+        """Devolver el contenido retenido completo"""
+        return join_entries(self.entries)
+
+    def append(self, content):
+        """Añadir al final entradas (o texto); devolver (entradas añadidas, entradas agrupadas que cambiaron)"""
+        entries, folded = self._fold(as_entries(content), prepend=False)
+        self.rejoined = None
+        if not entries:
+            return entries, folded
+        added = list(entries)
+
+        if self.entries and not self.entries[-1].text.endswith('\n'):
+            # La última entrada terminaba a mitad de línea: esa línea se vuelve a analizar
+            # junto con el texto nuevo (puede ser una cabecera incompleta)
+            last = self.entries[-1]
+            cut = last.text.rfind('\n') + 1
+            tail = last.text[cut:]
+            if cut == 0:
+                popped = self.entries.pop()
+                self._count(popped, -popped.repeats)
+                self.replaced_entries += 1
+            else:
+                last.text = last.text[:cut]
+            self.chars -= len(tail)
+            entries[:1] = entries_from_text(tail + entries[0].text)
+            self.rejoined = entries[0]
+
+        for entry in entries:
+            self.chars += len(entry.text)
+            if entry.continued and self.entries:
+                # El texto anterior a la primera cabecera continúa la última entrada
+                self.entries[-1].extend(entry)
+                if entry is self.rejoined:
+                    self.rejoined = self.entries[-1]
+            else:
+                self.entries.append(entry)
+                self.appended_entries += 1
+                self._count(entry, entry.repeats)
+        return added, folded
+
+    def prepend(self, content):
+        """Añadir al principio entradas más antiguas; devolver (entradas añadidas, entradas agrupadas que cambiaron)"""
+        entries, folded = self._fold(as_entries(content), prepend=True)
+        for entry in entries:
+            self.chars += len(entry.text)
+            self._count(entry, entry.repeats)
+        self.entries.extendleft(reversed(entries))
+        self.prepended_entries += len(entries)
+        if entries:
+            # Entre el historial añadido y lo retenido falta lo descartado: ya no hay un único inicio
+            self.trimmed_to = None
+        return entries, folded
+
+    def is_over_limit(self, factor=1):
+        """Comprobar si se ha superado alguno de los límites (multiplicados por factor)"""
+        return ((self.max_entries and len(self.entries) > self.max_entries * factor) or
+                (self.max_chars and self.chars > self.max_chars * factor))
+
+    def trim(self):
+        """Descartar entradas del principio si se superó el límite; devuelve las líneas descartadas"""
+        return sum(entry.line_count for entry in self.trim_entries())
+
+    def trim_entries(self):
+        """Descartar entradas del principio si se superó el límite; devuelve las entradas descartadas"""
+        if not self.is_over_limit():
+            return []
+
+        # Recortar por debajo del límite para que el coste se reparta entre muchas actualizaciones
+        target_entries = int(self.max_entries * TRIM_TARGET) if self.max_entries else 0
+        target_chars = int(self.max_chars * TRIM_TARGET) if self.max_chars else 0
+
+        dropped = []
+        # Se conserva siempre la última entrada, que puede seguir creciendo
+        while len(self.entries) > 1 and (
+                (target_entries and len(self.entries) > target_entries) or
+                (target_chars and self.chars > target_chars)):
+            entry = self.entries.popleft()
+            self.chars -= len(entry.text)
+            dropped.append(entry)
+            if entry.offset is not None and entry.length is not None:
+                self.trimmed_to = entry.offset + entry.length
+            self._count(entry, -entry.repeats)
+            if self.folder:
+                self.folder.forget(entry)
+
+        return dropped
+
+    def is_folded(self, entry):
+        """Comprobar si una entrada sigue retenida como representante de sus repeticiones"""
+        return bool(self.folder) and self.folder.is_representative(entry)
+
+    def _fold(self, entries, prepend):
+        """Quitar de entries las repeticiones de mensajes ya retenidos y contarlas"""
+        if not self.folder or not entries:
+            return entries, []
+        entries, absorbed = self.folder.fold(entries, prepend)
+        # Las repeticiones de entradas de este mismo lote ya se cuentan al añadirlas
+        new = set(entries)
+        for representative in absorbed:
+            if representative not in new:
+                self._count(representative, 1)
+        return entries, list(dict.fromkeys(absorbed))
+
+    def _count(self, entry, delta):
+        """Sumar delta al contador del nivel de una entrada"""
+        # El nivel ya viene calculado al segmentar: no se vuelve a leer el texto
+        self.level_counts[entry.level] = self.level_counts.get(entry.level, 0) + delta
@@ -0,0 +1,84 @@
+"""
+WordPress Debug Viewer - Agrupación de eventos del sistema de archivos
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import threading
+import time
+
+
+class CoalescingScheduler:
+    """Agrupar eventos frecuentes en ejecuciones espaciadas con un vaciado final garantizado"""
+
+    def __init__(self, callback, min_interval=0.25):
+        self.callback = callback
+        self.min_interval = min_interval  # Segundos mínimos entre dos ejecuciones
+        self.condition = threading.Condition()
+        self.pending = False  # Hay eventos sin procesar
+        self.due = None  # Instante de una ejecución programada sin evento (o None)
+        self.running = True
+        self.last_run = 0.0
+        self.events = 0  # Eventos recibidos
+        self.runs = 0  # Ejecuciones realizadas
+
+        # Hilo que ejecuta el callback fuera del hilo del observador
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def trigger(self):
+        """Registrar un evento; varios eventos seguidos producen una sola ejecución"""
+        with self.condition:
+            self.pending = True
+            self.events += 1
+            self.condition.notify()
+
+    def trigger_after(self, delay):
+        """Programar una ejecución dentro de delay segundos aunque no lleguen eventos"""
+        with self.condition:
+            due = time.monotonic() + delay
+            if self.due is None or due < self.due:
+                self.due = due
+            self.condition.notify()
+
+    def stop(self, timeout=2.0):
+        """Detener el hilo del planificador"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def _run(self):
+        """Bucle del hilo: esperar eventos y ejecutar el callback respetando el intervalo"""
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    if self.due is None:
+                        self.condition.wait()
+                    elif self.due <= time.monotonic():
+                        self.pending = True
+                    else:
+                        self.condition.wait(self.due - time.monotonic())
+
+                # Esperar hasta que haya pasado el intervalo mínimo desde la última ejecución.
+                # Los eventos que lleguen mientras tanto se agrupan en esta misma ejecución
+                while self.running:
+                    delay = self.last_run + self.min_interval - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self.condition.wait(delay)
+
+                if not self.running:
+                    return
+                self.pending = False
+                self.due = None
+
+            # Los eventos que lleguen durante la ejecución dejan pendiente otra más,
+            # de modo que la última escritura siempre se procesa
+            try:
+                self.callback()
+            except Exception as e:
+                print(f"Error en la actualización programada: {e}")
+            self.runs += 1
+            self.last_run = time.monotonic()
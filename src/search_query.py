@@ -0,0 +1,132 @@
+"""
+WordPress Debug Viewer - Consultas de búsqueda: texto o expresión regular y filtros por campo
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import re
+
+from log_entry import LEVEL_CUSTOM, LEVEL_ORDER, lowercase
+from log_index import parse_time_input
+from regex_guard import match_spans
+from text_search import find_offsets
+
+# Filtros por campo que se pueden escribir junto al texto buscado, por ejemplo:
+#   nivel:fatal,warning desde:2026-10-17T10:00 plugin:woocommerce "undefined index"
+# Los valores con espacios van entre comillas: desde:"17-Oct-2026 10:00:00"
+FIELD_PATTERN = re.compile(r'(?<!\S)(\w+):("[^"]*"|\S+)')
+FIELD_NAMES = {'nivel': 'nivel', 'level': 'nivel', 'desde': 'desde', 'since': 'desde',
+               'hasta': 'hasta', 'until': 'hasta', 'archivo': 'archivo', 'file': 'archivo',
+               'plugin': 'plugin'}
+LEVEL_NAMES = dict({level.lower(): level for level in LEVEL_ORDER}, otros=LEVEL_CUSTOM)
+
+# Rutas de archivos PHP que aparecen en los mensajes ("in /var/www/.../archivo.php on line 10")
+PATH_PATTERN = re.compile(r'(?:[A-Za-z]:)?[/\\][^\s:"\'()]*\.php')
+# Slug del plugin en una ruta (plugins/<slug>/ o mu-plugins/<slug>/)
+PLUGIN_PATTERN = re.compile(r'[/\\](?:mu-)?plugins[/\\]([^/\\\s]+)', re.IGNORECASE)
+
+
+class SearchQuery:
+    """Texto (o expresión regular) que se busca y filtros por nivel, fecha, archivo y plugin"""
+
+    def __init__(self, text, use_regex=False):
+        # Lanza ValueError con un mensaje para el usuario si la consulta no es válida
+        self.levels = None  # Niveles admitidos (o None para todos)
+        self.since = None  # Segundos UTC (o None)
+        self.until = None
+        self.paths = []  # Fragmentos de ruta, en minúsculas
+        self.plugins = []  # Slugs de plugin, en minúsculas
+        self.pattern = None  # Expresión regular compilada, en modo regex
+        self.term = ""  # Texto literal en minúsculas, en modo texto
+
+        remaining = []
+        last = 0
+        for match in FIELD_PATTERN.finditer(text):
+            field = FIELD_NAMES.get(match.group(1).lower())
+            if field is None:
+                # No es un filtro conocido (por ejemplo, "PHP Warning:" o una URL): es texto
+                continue
+            remaining.append(text[last:match.start()])
+            last = match.end()
+            self._add_field(field, match.group(2).strip('"'))
+        remaining.append(text[last:])
+        # Los espacios dentro de cada tramo se respetan (PHP separa el nivel con dos espacios)
+        term = " ".join(part.strip() for part in remaining if part.strip())
+
+        if use_regex and term:
+            try:
+                self.pattern = re.compile(term, re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Expresión no válida: {e}")
+        else:
+            self.term = lowercase(term)
+
+    def _add_field(self, field, value):
+        """Guardar el valor de un filtro por campo"""
+        if not value:
+            raise ValueError(f"Falta el valor de {field}:")
+        if field == 'nivel':
+            levels = set()
+            for name in value.lower().split(','):
+                if name not in LEVEL_NAMES:
+                    raise ValueError(f"Nivel desconocido: {name}")
+                levels.add(LEVEL_NAMES[name])
+            self.levels = levels if self.levels is None else self.levels | levels
+        elif field in ('desde', 'hasta'):
+            timestamp = parse_time_input(value)
+            if timestamp is None:
+                raise ValueError(f"Fecha no reconocida: {value}")
+            if field == 'desde':
+                self.since = timestamp
+            else:
+                self.until = timestamp
+        elif field == 'archivo':
+            self.paths.append(value.lower())
+        else:
+            self.plugins.append(value.lower())
+
+    @property
+    def is_empty(self):
+        """Comprobar si la consulta no busca ni filtra nada"""
+        return (self.pattern is None and not self.term and self.levels is None and self.since is None
+                and self.until is None and not self.paths and not self.plugins)
+
+    def accepts(self, entry, level):
+        """Comprobar si una entrada cumple los filtros por nivel, fecha, archivo y plugin"""
+        # level es el nivel con el que se muestra la entrada (las que continúan a otra heredan el suyo)
+        if self.levels is not None and level not in self.levels:
+            return False
+        if self.since is not None or self.until is not None:
+            timestamp = entry.timestamp
+            if (timestamp is None or (self.since is not None and timestamp < self.since)
+                    or (self.until is not None and timestamp > self.until)):
+                return False
+
+        if self.paths:
+            paths = [path.lower() for path in PATH_PATTERN.findall(entry.text)]
+            if not any(fragment in path for fragment in self.paths for path in paths):
+                return False
+        if self.plugins:
+            slugs = {slug.lower() for slug in PLUGIN_PATTERN.findall(entry.text)}
+            if not any(plugin in slugs for plugin in self.plugins):
+                return False
+        return True
+
+    def find(self, entry, level):
+        """Tramos (posición, longitud) que coinciden en una entrada, o [] si no cumple los filtros"""
+        if not self.accepts(entry, level):
+            return []
+
+        text = entry.text
+        if self.pattern is not None:
+            return match_spans(self.pattern, [text])[0]
+        if self.term:
+            return [(offset, len(self.term)) for offset in find_offsets(entry.lowercase_text, self.term)]
+
+        # Solo filtros por campo: se marca la primera línea de cada entrada que los cumple, con
+        # su salto de línea para resaltarla entera, una vez completa (si aún se está
+        # escribiendo se marcará cuando llegue el resto)
+        if entry.continued:
+            return []
+        end = text.find('\n')
+        return [(0, end + 1)] if end > 0 else []
+
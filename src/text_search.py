@@ -0,0 +1,209 @@
+"""
+WordPress Debug Viewer - Búsqueda en el texto de las entradas sin recorrer el widget
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import re
+import threading
+from tkinter import TkVersion
+
+from log_entry import LEVEL_CUSTOM, LogEntry, entries_from_text
+from regex_guard import TIMEOUT
+
+# Entradas que examina el hilo de búsqueda entre dos entregas de resultados parciales
+SEARCH_CHUNK_ENTRIES = 2000
+
+# Tk 8.6 guarda el texto en UTF-16: los caracteres fuera del plano básico (emoji) ocupan dos
+# columnas en sus índices, aunque en Python cuenten como uno
+WIDE_CHARS_COUNT_TWICE = TkVersion < 8.7
+WIDE_CHAR_PATTERN = re.compile('[\U00010000-\U0010ffff]')
+
+
+def tk_width(text, start=0, end=None):
+    """Columnas que ocupa en un índice de Tk el tramo text[start:end]"""
+    if end is None:
+        end = len(text)
+    if not WIDE_CHARS_COUNT_TWICE:
+        return end - start
+    return end - start + len(WIDE_CHAR_PATTERN.findall(text, start, end))
+
+
+def find_offsets(lowered, term):
+    """Posiciones de las coincidencias de term (ya en minúsculas) en lowered, sin solaparse"""
+    offsets = []
+    pos = lowered.find(term)
+    while pos >= 0:
+        offsets.append(pos)
+        pos = lowered.find(term, pos + len(term))
+    return offsets
+
+
+def spans_to_indices(text, spans, line=1, column=0):
+    """Convertir tramos (posición, longitud) de text en coincidencias (inicio, fin) del widget"""
+    # text empieza en line.column del widget; el fin tiene la forma "<inicio>+<n>c",
+    # la misma que usaban las coincidencias de Tk. Las posiciones de text se pasan a
+    # columnas de Tk solo si contiene caracteres que Tk cuenta dos veces
+    wide = WIDE_CHARS_COUNT_TWICE and WIDE_CHAR_PATTERN.search(text) is not None
+    matches = []
+    line_start = 0  # Posición en text del principio de la línea actual
+    scanned = 0
+    for offset, length in spans:
+        newlines = text.count('\n', scanned, offset)
+        if newlines:
+            line += newlines
+            line_start = text.rfind('\n', scanned, offset) + 1
+            column = 0
+        scanned = offset
+        if wide:
+            start = f"{line}.{column + tk_width(text, line_start, offset)}"
+            length = tk_width(text, offset, offset + length)
+        else:
+            start = f"{line}.{column + offset - line_start}"
+        matches.append((start, f"{start}+{length}c"))
+    return matches
+
+
+def snapshot_entries(entries):
+    """Copiar (texto, líneas, continúa) de cada entrada para buscar en otro hilo"""
+    # Las entradas de la vista cambian mientras se busca (repeticiones, nuevo análisis del
+    # final): el hilo de búsqueda solo ve esta copia
+    return [(entry.text, entry.line_count, entry.continued) for entry in entries]
+
+
+def shift_matches(matches, lines):
+    """Subir coincidencias (inicio, fin) lines líneas, descartando las que quedan fuera del widget"""
+    # Con lines negativo las coincidencias bajan (se insertó texto al principio)
+    shifted = []
+    for start_pos, end_pos in matches:
+        line, column = start_pos.split('.')
+        line = int(line) - lines
+        if line >= 1:
+            new_start = f"{line}.{column}"
+            # end_pos siempre tiene la forma "<start_pos>+<n>c"
+            shifted.append((new_start, new_start + end_pos[len(start_pos):]))
+    return shifted
+
+
+def find_in_runs(runs, query, hidden_levels=(), line=1, column=0, prefix=""):
+    """Coincidencias de query en tramos (nivel, texto) insertados en line.column del widget"""
+    # prefix es el texto de la misma línea que precede a los tramos, para encontrar
+    # también las coincidencias que empiezan antes de ellos. El texto de cada tramo se
+    # vuelve a segmentar para conocer la fecha y el nivel de cada entrada
+    matches = []
+    for level, text in runs:
+        if level not in hidden_levels:
+            start_column = column - tk_width(prefix)
+            entry_line = line
+            for entry in entries_from_text(prefix + text):
+                entry_level = level if entry.continued else entry.level
+                if entry_level not in hidden_levels:
+                    spans = query.find(entry, entry_level)
+                    if prefix:
+                        # Las coincidencias que terminan dentro de prefix ya se encontraron antes
+                        spans = [span for span in spans if span[0] + span[1] > len(prefix)]
+                    if spans:
+                        matches.extend(spans_to_indices(entry.text, spans, entry_line, start_column))
+                entry_line += entry.line_count
+                start_column = 0
+                prefix = ""
+        prefix = ""
+        newlines = text.count('\n')
+        if newlines:
+            line += newlines
+            column = tk_width(text, text.rfind('\n') + 1)
+        else:
+            column += tk_width(text)
+    return matches
+
+
+class SearchJob:
+    """Buscar una consulta en una copia de las entradas en otro hilo, con resultados parciales"""
+
+    def __init__(self, query, entries, hidden_levels=(), regex_guard=None):
+        self.query = query
+        self.entries = entries  # (texto, líneas, continúa) de cada entrada, de snapshot_entries
+        self.hidden_levels = frozenset(hidden_levels)
+        self.regex_guard = regex_guard  # Para evaluar la expresión regular con límite de tiempo
+        self.lock = threading.Lock()
+        self.pending = []  # Coincidencias encontradas que la interfaz aún no ha recogido
+        self.scanned = 0  # Entradas examinadas
+        self.done = False
+        self.error = None  # Mensaje para el usuario si la búsqueda no se completó
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+
+    def start(self):
+        """Empezar a buscar"""
+        self.thread.start()
+
+    def cancel(self):
+        """Detener la búsqueda en cuanto termine la entrada que está examinando"""
+        self.cancelled.set()
+
+    def take_matches(self):
+        """Devolver las coincidencias encontradas desde la última llamada"""
+        with self.lock:
+            matches, self.pending = self.pending, []
+        return matches
+
+    def progress(self):
+        """Fracción de las entradas ya examinadas"""
+        return self.scanned / len(self.entries) if self.entries else 1.0
+
+    def _publish(self, matches, scanned):
+        """Entregar coincidencias a la interfaz"""
+        with self.lock:
+            self.pending.extend(matches)
+            self.scanned = scanned
+
+    def _run(self):
+        """Bucle del hilo: recorrer las entradas por bloques con su línea en el widget"""
+        try:
+            # El módulo re no suelta el GIL mientras busca: con el guardián, la expresión regular
+            # se evalúa en su proceso y, si se atasca, se detiene allí sin congelar la ventana
+            use_guard = self.query.pattern is not None and self.regex_guard is not None
+            line = 1
+            level = LEVEL_CUSTOM
+            for first in range(0, len(self.entries), SEARCH_CHUNK_ENTRIES):
+                found = []
+                candidates = []  # (texto, línea) de las entradas que cumplen los filtros por campo
+                for text, line_count, continued in self.entries[first:first + SEARCH_CHUNK_ENTRIES]:
+                    if self.cancelled.is_set():
+                        return
+                    # Entrada propia del hilo: su nivel, fecha y minúsculas se calculan aquí
+                    entry = LogEntry(text=text, continued=continued)
+                    # Las entradas que continúan a la anterior se ocultan con ella
+                    level = level if continued else entry.level
+                    if level not in self.hidden_levels:
+                        if use_guard:
+                            if self.query.accepts(entry, level):
+                                candidates.append((text, line))
+                        else:
+                            spans = self.query.find(entry, level)
+                            if spans:
+                                found.extend(spans_to_indices(text, spans, line))
+                    line += line_count
+                if candidates:
+                    matches = self._find_in_guard(candidates)
+                    if matches is None:
+                        self.error = "La expresión tarda demasiado en evaluarse"
+                        return
+                    found.extend(matches)
+                self._publish(found, min(first + SEARCH_CHUNK_ENTRIES, len(self.entries)))
+        except Exception as e:
+            self.error = f"Error en la búsqueda: {e}"
+        finally:
+            self.done = True
+
+    def _find_in_guard(self, candidates):
+        """Coincidencias de la expresión en (texto, línea) evaluadas por el guardián, o None si se atasca"""
+        pattern = self.query.pattern
+        spans = self.regex_guard.find(pattern.pattern, pattern.flags, [text for text, line in candidates])
+        if spans is TIMEOUT:
+            return None
+        matches = []
+        for (text, line), text_spans in zip(candidates, spans):
+            if text_spans:
+                matches.extend(spans_to_indices(text, text_spans, line))
+        return matches
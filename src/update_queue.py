@@ -0,0 +1,90 @@
+"""
+WordPress Debug Viewer - Cola de actualizaciones entre el lector y la interfaz
+Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
+"""
+
+import threading
+from collections import deque
+
+# Máximo de caracteres pendientes de mostrar antes de descartar los más antiguos
+DEFAULT_MAX_PENDING = 32 * 1024 * 1024
+
+
+class UpdateQueue:
+    """Cola acotada y segura entre hilos para pasar entradas nuevas al hilo de Tk"""
+
+    def __init__(self, max_pending=DEFAULT_MAX_PENDING):
+        self.lock = threading.Lock()
+        self.max_pending = max_pending
+        self.replacement = None  # Entradas que sustituyen a toda la vista (o None)
+        self.chunks = deque()  # Listas de entradas a añadir al final, en orden de llegada
+        self.prepends = []  # Páginas de historial a añadir al principio, de la más reciente a la más antigua
+        self.pending = 0  # Caracteres de las entradas en self.chunks
+        self.dropped = 0  # Caracteres descartados por superar max_pending
+        self.flash = False
+        self.status = None  # Último texto de estado pendiente de mostrar (o None)
+        self.exceptions_changed = False  # Alguna excepción se puso en cuarentena
+
+    def put_content(self, entries):
+        """Sustituir todo el contenido; lo pendiente hasta ahora queda obsoleto"""
+        with self.lock:
+            self.replacement = entries
+            self.chunks.clear()
+            self.prepends = []
+            self.pending = 0
+            self.dropped = 0
+
+    def put_append(self, entries):
+        """Añadir entradas al final sin bloquear nunca al productor"""
+        if not entries:
+            return
+        # El texto se decodifica aquí, en el hilo del lector, y no en el de la interfaz
+        size = sum(len(entry.text) for entry in entries)
+        with self.lock:
+            self.chunks.append((entries, size))
+            self.pending += size
+
+            # Si la interfaz no da abasto, descartar los fragmentos más antiguos:
+            # el archivo en disco sigue siendo la referencia completa
+            while self.pending > self.max_pending and len(self.chunks) > 1:
+                _, dropped = self.chunks.popleft()
+                self.pending -= dropped
+                self.dropped += dropped
+
+    def put_prepend(self, entries):
+        """Añadir al principio una página de entradas más antiguas"""
+        if not entries:
+            return
+        with self.lock:
+            self.prepends.append(entries)
+
+    def put_flash(self):
+        """Pedir que el título parpadee"""
+        with self.lock:
+            self.flash = True
+
+    def put_status(self, text):
+        """Cambiar el texto de estado; solo importa el último"""
+        with self.lock:
+            self.status = text
+
+    def put_exceptions_changed(self):
+        """Pedir que se actualice la lista de excepciones"""
+        with self.lock:
+            self.exceptions_changed = True
+
+    def drain(self):
+        """Extraer todo lo pendiente como un único lote"""
+        with self.lock:
+            chunks = [entry for entries, _ in self.chunks for entry in entries]
+            batch = (self.replacement, self.prepends, chunks, self.dropped, self.flash, self.status,
+                     self.exceptions_changed)
+            self.replacement = None
+            self.chunks.clear()
+            self.prepends = []
+            self.pending = 0
+            self.dropped = 0
+            self.flash = False
+            self.status = None
+            self.exceptions_changed = False
+        return batch
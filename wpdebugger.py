@@ -3,6 +3,7 @@ WordPress Debug Viewer - Herramienta para monitorear logs de depuración de Word
 Desarrollado por Luis Eduardo G. González (DevActivo.com | EspecialistaEnWP.com)
 """
 
+import multiprocessing
 import sys
 import os
 
@@ -32,4 +33,6 @@ if hasattr(sys, '_MEIPASS'):
 from src.main_modern import main
 
 if __name__ == "__main__":
+    # Necesario para el proceso de filtrado en los ejecutables de PyInstaller
+    multiprocessing.freeze_support()
     main()
@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 import os
 
@@ -27,4 +28,6 @@ if hasattr(sys, '_MEIPASS'):
 from src.main_modern import main
 
 if __name__ == "__main__":
+    # Necesario para el proceso de filtrado en los ejecutables de PyInstaller
+    multiprocessing.freeze_support()
     main()
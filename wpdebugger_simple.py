@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 import os
 
@@ -41,6 +42,8 @@ except ImportError:
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Necesario para el proceso de filtrado en los ejecutables de PyInstaller
+    multiprocessing.freeze_support()
     print("NOTA: Estás usando la versión legacy con interfaz tradicional.")
     print("Para usar la versión moderna con CustomTkinter, ejecuta 'wpdebugger.py'")
     main()